@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class AlertScheduler:
+    """음성 안내 알림을 우선순위 큐로 관리 (같은 알림은 합치고, 더 급한 알림은 재생 중인 안내를 선점)
+
+    priorities: 알림 이름 -> 우선순위 (작을수록 급함)
+    재생은 AudioCueEngine의 타이머 스레드 하나에서만 이루어지며 알림마다 스레드를 만들지 않음
+    """
+
+    def __init__(self, engine, priorities, max_wait_s=30.0, history=200):
+        self.engine = engine
+        self.priorities = priorities
+        self.max_wait_s = max_wait_s  # 이보다 오래 기다린 알림은 대상이 이미 떠난 것으로 보고 버림
+        self.current = None  # (우선순위, 알림 이름)
+        self.latencies_ms = deque(maxlen=history)  # 요청~재생 시작 대기 시간
+        self.played = 0
+        self.coalesced = 0
+        self.preempted = 0
+        self.expired = 0
+        self._queue = []  # (우선순위, 요청 시각, 순번, 알림 이름) 힙
+        self._queued = set()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(self, name):
+        """알림 요청 (즉시 반환), 알 수 없는 알림이면 False"""
+        priority = self.priorities.get(name)
+        if priority is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if name in self._queued or (self.current is not None and self.current[1] == name):
+                self.coalesced += 1
+                log.info("ℹ️ %s 알림 합침: 이미 재생 또는 대기 중", name)
+                return True
+            if self.current is not None and priority < self.current[0]:
+                preempted = self.current[1]
+                self.engine.cancel()
+                self.current = None
+                self.preempted += 1
+                log.info("⏭️ %s 안내 중단: 더 급한 %s 알림 우선", preempted, name)
+            heapq.heappush(self._queue, (priority, now, next(self._order), name))
+            self._queued.add(name)
+            if self.current is None:
+                self._start_next()
+            else:
+                log.info("🕒 %s 알림 대기 (%s 재생 중, 대기 %d개)", name, self.current[1], len(self._queue))
+        return True
+
+    def resume(self):
+        """오디오 초기화가 끝난 뒤 호출: 그동안 대기열에 남겨 둔 알림 재생 시작"""
+        with self._lock:
+            if self.current is None:
+                self._start_next()
+
+    @property
+    def busy(self):
+        return self.current is not None or bool(self._queue)
+
+    def stats(self):
+        """대기 시간 분포와 처리 건수"""
+        with self._lock:
+            latencies = np.asarray(self.latencies_ms, dtype=np.float64)
+            stats = {
+                "queued": len(self._queue),
+                "current": self.current[1] if self.current is not None else None,
+                "played": self.played,
+                "coalesced": self.coalesced,
+                "preempted": self.preempted,
+                "expired": self.expired,
+            }
+        if latencies.size:
+            p50, p95 = np.percentile(latencies, [50, 95]).tolist()
+            stats.update({"wait_p50_ms": round(p50, 1), "wait_p95_ms": round(p95, 1),
+                          "wait_max_ms": round(float(latencies.max()), 1)})
+        return stats
+
+    def _start_next(self):
+        """가장 급한 대기 알림 재생 시작 (self._lock 보유 상태에서 호출)"""
+        while self._queue:
+            if not self.engine.ready and not self.engine.failed:
+                # 오디오 초기화가 백그라운드에서 진행 중이면 대기열에 남겨 두고 resume()에서 재생
+                return
+            priority, submitted_at, _, name = heapq.heappop(self._queue)
+            self._queued.discard(name)
+            wait_s = time.monotonic() - submitted_at
+            if wait_s > self.max_wait_s:
+                self.expired += 1
+                log.info("🗑️ %s 알림 만료 (%.1f초 대기)", name, wait_s)
+                continue
+            if not self.engine.play(name, on_done=self._on_done):
+                log.error("❌ %s 알림 재생 실패", name)
+                continue
+            self.current = (priority, name)
+            self.played += 1
+            self.latencies_ms.append(wait_s * 1000)
+            log.info("🔔 %s 알림 재생 시작 (대기 %.0fms, 남은 알림 %d개)", name, wait_s * 1000, len(self._queue))
+            return
+
+    def _on_done(self, name):
+        with self._lock:
+            if self.current is not None and self.current[1] == name:
+                self.current = None
+            log.info("✅ %s 알림 재생 완료", name)
+            if self.current is None:
+                self._start_next()
@@ -0,0 +1,163 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from lazyImport import lazy_module
+
+pygame = lazy_module("pygame")
+log = logging.getLogger(__name__)
+
+
+class AudioCueEngine:
+    """미리 디코딩한 Sound 버퍼와 타이머 스레드로 음성 안내 순서를 재생 (재생 중에는 CPU를 거의 쓰지 않음)
+
+    cues: 이름 -> [(파일 경로, 구간 길이 초, 반복 간격 초), ...]
+      반복 간격 None: 한 번 재생하고 구간 길이만큼 대기
+      반복 간격 0: 구간 길이 동안 끊김 없이 반복 (SDL 믹서가 반복 처리)
+      반복 간격 > 0: 구간 길이 동안 해당 간격마다 다시 재생
+    """
+
+    def __init__(self, cues, frequency=44100, size=-16, channels=2, buffer=4096):
+        self.cues = cues
+        self.mixer_args = {"frequency": frequency, "size": size, "channels": channels, "buffer": buffer}
+        self.ready = False
+        self.failed = False  # 초기화 실패 (장치 없음 등), 다시 시도하지 않음
+        self.current = None  # 재생 중인 안내 이름
+        self._sounds = {}
+        self._channel = None
+        self._on_done = None
+        self._timers = []  # (실행 시각, 순번, 콜백, 인자) 힙
+        self._order = itertools.count()
+        self._running = False
+        self._init_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def init(self):
+        """pygame.mixer 초기화와 모든 안내 음원 디코딩 (한 번만, 탐지 스레드가 아닌 백그라운드에서 호출)"""
+        with self._init_lock:
+            if self.ready:
+                return True
+            if self.failed:
+                return False
+            try:
+                pygame.mixer.init(**self.mixer_args)
+                sounds = {}
+                for steps in self.cues.values():
+                    for path, _, _ in steps:
+                        if path not in sounds:
+                            sounds[path] = pygame.mixer.Sound(path)
+                # 안내 전용 채널을 예약해 다른 효과음과 섞이지 않도록 함
+                pygame.mixer.set_reserved(1)
+                self._channel = pygame.mixer.Channel(0)
+            except FileNotFoundError as e:
+                log.error("❌ 오디오 파일 로드 에러: %s", e)
+                self.failed = True
+                return False
+            except Exception as e:
+                log.error("❌ pygame.mixer 초기화 에러: %s", e)
+                self.failed = True
+                return False
+            self._sounds = sounds
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="audio-cues", daemon=True)
+            self._thread.start()
+            self.ready = True
+            log.info("🎵 pygame.mixer 초기화 완료 (frequency=%s, buffer=%s, 음원 %d개 디코딩)",
+                     self.mixer_args['frequency'], self.mixer_args['buffer'], len(sounds))
+            return True
+
+    def play(self, name, on_done=None):
+        """안내 재생을 예약하고 바로 반환 (초기화 전이거나 이미 재생 중이거나 없는 안내면 False)
+
+        초기화(mixer, 음원 디코딩)는 하지 않음: 호출한 탐지 스레드를 막지 않도록 init()은 미리 따로 호출
+        """
+        steps = self.cues.get(name)
+        if not steps or not self.ready:
+            return False
+        with self._cond:
+            if self.current is not None:
+                return False
+            self.current = name
+            self._on_done = on_done
+            start = time.monotonic()
+            for path, duration_s, repeat_s in steps:
+                sound = self._sounds[path]
+                if repeat_s is None:
+                    self._schedule(start, self._play, path, sound)
+                elif repeat_s == 0:
+                    self._schedule(start, self._play, path, sound, -1, int(duration_s * 1000))
+                else:
+                    for offset in itertools.takewhile(lambda t: t < duration_s, itertools.count(0, repeat_s)):
+                        self._schedule(start + offset, self._play, path, sound)
+                start += duration_s
+            self._schedule(start, self._finish)
+            self._cond.notify_all()
+        return True
+
+    def cancel(self):
+        """재생 중인 안내를 즉시 중단하고 남은 예약 삭제 (완료 콜백은 호출하지 않음), 중단된 안내 이름 반환"""
+        with self._cond:
+            name = self.current
+            self.current = None
+            self._on_done = None
+            self._timers.clear()
+            if name is not None and self._channel is not None:
+                self._channel.stop()
+            self._cond.notify_all()
+        return name
+
+    def stop(self):
+        """재생 중인 안내를 멈추고 타이머 스레드와 mixer 종료"""
+        with self._cond:
+            self._running = False
+            self._timers.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self.ready:
+            try:
+                self._channel.stop()
+                pygame.mixer.quit()
+                log.info("🎵 pygame.mixer 종료")
+            except Exception as e:
+                log.error("❌ pygame.mixer 종료 에러: %s", e)
+            self.ready = False
+
+    def _schedule(self, at, callback, *args):
+        heapq.heappush(self._timers, (at, next(self._order), callback, args))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # 다음 예약 시각까지 잠들어 있음 (바쁜 대기 없음)
+                while self._running and (not self._timers or self._timers[0][0] > time.monotonic()):
+                    timeout = self._timers[0][0] - time.monotonic() if self._timers else None
+                    self._cond.wait(timeout)
+                if not self._running:
+                    break
+                # 꺼내기와 실행을 같은 잠금 안에서 해 cancel() 이후 이전 안내가 재생되지 않도록 함
+                _, _, callback, args = heapq.heappop(self._timers)
+                try:
+                    finished = callback(*args)
+                except Exception as e:
+                    log.error("❌ 오디오 재생 에러: %s", e)
+                    finished = None
+            # 완료 콜백은 잠금 밖에서 호출 (콜백 안에서 다음 안내를 바로 재생할 수 있음)
+            if finished is not None:
+                on_done, name = finished
+                if on_done is not None:
+                    on_done(name)
+
+    def _play(self, path, sound, loops=0, maxtime_ms=0):
+        self._channel.play(sound, loops=loops, maxtime=maxtime_ms)
+        log.info("▶️ %s 재생 중...", path)
+
+    def _finish(self):
+        self._channel.stop()
+        name, on_done = self.current, self._on_done
+        self.current = None
+        self._on_done = None
+        return on_done, name
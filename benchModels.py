@@ -0,0 +1,221 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import time
+from collections import Counter
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows (모델 학습/내보내기 PC)
+    resource = None
+
+from detections import extract_detections
+from frameSource import open_source
+from modelRegistry import discover, get_model
+from ncnnDetector import box_iou
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB), 측정할 수 없으면 0"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, 리눅스는 KB 단위
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def load_backend(info, backend, threads):
+    if backend == "ncnn":
+        from ncnnDetector import NcnnDetector
+        return NcnnDetector(info.path, num_threads=threads)
+    from ultralytics import YOLO
+    return YOLO(info.path, task="detect")
+
+
+def bench_model(name, clip, backend="ncnn", threads=4, conf=0.65, iou=0.45,
+                max_frames=0, warmup=5, keep_detections=False):
+    """클립 전체를 한 모델로 추론하고 지연 시간/FPS/RSS/클래스별 탐지 수 반환
+
+    keep_detections=True 이면 측정 프레임별 탐지 [[class_id, conf, x1, y1, x2, y2], ...]도 반환
+    (같은 클립으로 측정한 다른 모델과 detection_agreement()로 비교)
+    """
+    info = get_model(name)
+    load_start = time.perf_counter()
+    model = load_backend(info, backend, threads)
+    load_s = time.perf_counter() - load_start
+
+    cap = open_source(clip)
+    if not cap.isOpened():
+        raise RuntimeError(f"클립을 열 수 없습니다: {clip}")
+
+    latencies = []
+    counts = Counter()
+    per_frame = []
+    frames = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret or (max_frames and frames >= max_frames + warmup):
+                break
+            start = time.perf_counter()
+            results = model.predict(source=frame, conf=conf, iou=iou, imgsz=list(info.imgsz), verbose=False)
+            elapsed = time.perf_counter() - start
+            frames += 1
+            if frames <= warmup:
+                continue
+            latencies.append(elapsed * 1000)
+            cls, _, scores, xyxy = extract_detections(results[0])
+            for class_id, count in zip(*np.unique(cls, return_counts=True)):
+                counts[info.names.get(int(class_id), str(class_id))] += int(count)
+            if keep_detections:
+                per_frame.append(np.column_stack([cls, scores, xyxy]).round(2).tolist())
+    finally:
+        cap.release()
+
+    if not latencies:
+        raise RuntimeError(f"측정된 프레임이 없습니다 (warmup={warmup})")
+    latencies = np.asarray(latencies)
+    result = {
+        "model": info.name,
+        "backend": backend,
+        "imgsz": list(info.imgsz),
+        "frames": len(latencies),
+        "load_s": round(load_s, 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "fps": round(1000.0 / float(latencies.mean()), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "detections": dict(sorted(counts.items())),
+    }
+    if keep_detections:
+        result["frame_detections"] = per_frame
+    return result
+
+
+def detection_agreement(reference, candidate, names=None, iou_threshold=0.5):
+    """같은 클립의 프레임별 탐지를 기준 모델(예: fp32)과 비교한 일치율
+
+    프레임마다 같은 클래스끼리 IoU가 가장 높은 박스를 신뢰도 순으로 짝지음
+    recall: 기준 탐지 중 후보 모델도 찾은 비율, precision: 후보 탐지 중 기준에도 있는 비율
+    """
+    names = names or {}
+    matched = total_ref = total_cand = 0
+    ious = []
+    per_class = Counter()
+    per_class_matched = Counter()
+    for ref_frame, cand_frame in zip(reference, candidate):
+        ref = np.asarray(ref_frame, dtype=np.float64).reshape(-1, 6)
+        cand = np.asarray(cand_frame, dtype=np.float64).reshape(-1, 6)
+        total_ref += len(ref)
+        total_cand += len(cand)
+        for class_id in ref[:, 0].astype(int):
+            per_class[class_id] += 1
+        if not len(ref) or not len(cand):
+            continue
+        iou = box_iou(ref[:, 2:], cand[:, 2:])
+        iou[ref[:, None, 0] != cand[None, :, 0]] = 0.0
+        used = np.zeros(len(cand), dtype=bool)
+        for i in np.argsort(-ref[:, 1]):
+            row = np.where(used, 0.0, iou[i])
+            j = int(row.argmax())
+            if row[j] >= iou_threshold:
+                used[j] = True
+                matched += 1
+                ious.append(row[j])
+                per_class_matched[int(ref[i, 0])] += 1
+
+    recall = matched / total_ref if total_ref else 1.0
+    precision = matched / total_cand if total_cand else 1.0
+    f1 = 2 * recall * precision / (recall + precision) if recall + precision else 0.0
+    return {
+        "frames": min(len(reference), len(candidate)),
+        "iou_threshold": iou_threshold,
+        "reference_boxes": total_ref,
+        "candidate_boxes": total_cand,
+        "matched": matched,
+        "recall": round(recall, 4),
+        "precision": round(precision, 4),
+        "f1": round(f1, 4),
+        "mean_iou": round(float(np.mean(ious)), 4) if ious else 0.0,
+        "class_recall": {
+            names.get(class_id, str(class_id)): round(per_class_matched[class_id] / count, 4)
+            for class_id, count in sorted(per_class.items())
+        },
+    }
+
+
+def _bench_child(conn, kwargs):
+    try:
+        conn.send(("ok", bench_model(**kwargs)))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+def bench_isolated(**kwargs):
+    """모델마다 별도 프로세스에서 측정해 peak RSS가 섞이지 않도록 함"""
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_bench_child, args=(child, kwargs))
+    process.start()
+    child.close()
+    status, payload = parent.recv()
+    process.join()
+    if status != "ok":
+        raise RuntimeError(payload)
+    return payload
+
+
+def print_report(rows):
+    print(f"{'model':14s} {'imgsz':>9s} {'p50(ms)':>8s} {'p95(ms)':>8s} {'FPS':>6s} {'RSS(MB)':>8s}  detections")
+    for row in sorted(rows, key=lambda r: r["p50_ms"]):
+        imgsz = "x".join(str(v) for v in row["imgsz"])
+        detections = ", ".join(f"{k}={v}" for k, v in row["detections"].items()) or "-"
+        print(f"{row['model']:14s} {imgsz:>9s} {row['p50_ms']:8.1f} {row['p95_ms']:8.1f} "
+              f"{row['fps']:6.1f} {row['peak_rss_mb']:8.1f}  {detections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="내보낸 NCNN 모델 전체 벤치마크")
+    parser.add_argument("clip", help="녹화된 영상 파일 또는 JPEG 디렉터리 경로")
+    parser.add_argument("--models", nargs="*", help="측정할 모델 이름 (기본: 전체)")
+    parser.add_argument("--backend", choices=["ncnn", "ultralytics"], default="ncnn")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--conf", type=float, default=0.65)
+    parser.add_argument("--iou", type=float, default=0.45)
+    parser.add_argument("--max-frames", type=int, default=0, help="0이면 클립 전체")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    registry = discover()
+    names = args.models or list(registry)
+    rows = []
+    for name in names:
+        if name in registry and not registry[name].has_weights:
+            print(f"⚠️ {name}: model.ncnn.bin 없음, 건너뜀")
+            continue
+        print(f"🔍 {name} 측정 중...")
+        try:
+            rows.append(bench_isolated(
+                name=name, clip=args.clip, backend=args.backend, threads=args.threads,
+                conf=args.conf, iou=args.iou, max_frames=args.max_frames, warmup=args.warmup,
+            ))
+        except Exception as e:
+            print(f"❌ {name} 측정 에러: {e}")
+
+    if rows:
+        print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"device": platform.node(), "clip": args.clip, "results": rows}, f,
+                      ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# 화질 단계 (좋은 순): (해상도 비율 %, JPEG 품질, 전송 간격 초)
+DEFAULT_LEVELS = [
+    (100, 80, 0.03),
+    (85, 75, 0.03),
+    (70, 70, 0.03),
+    (60, 60, 0.06),
+    (50, 50, 0.1),
+    (40, 40, 0.15),
+    (30, 35, 0.25),
+]
+
+
+class BitrateController:
+    """Socket.IO 전송 대기열 길이와 ack 왕복 시간으로 해상도/JPEG 품질/전송 간격을 조절"""
+
+    def __init__(self, queue_depth=None, levels=None, start_level=2,
+                 max_queue=3, high_rtt_ms=400.0, low_rtt_ms=150.0,
+                 step_up_after=20, step_down_cooldown=5, ack_timeout_s=3.0, alpha=0.3):
+        self.queue_depth = queue_depth or (lambda: 0)
+        self.levels = list(levels or DEFAULT_LEVELS)
+        self.level = min(start_level, len(self.levels) - 1)
+        self.max_queue = max_queue
+        self.high_rtt_ms = high_rtt_ms
+        self.low_rtt_ms = low_rtt_ms
+        self.step_up_after = step_up_after
+        self.step_down_cooldown = step_down_cooldown
+        self.ack_timeout_s = ack_timeout_s
+        self.alpha = alpha
+        self.rtt_ms = None
+        self.ack_supported = None  # None: 아직 모름, False: 서버가 ack를 보내지 않음
+        self._pending = {}  # 전송 번호 -> (방 이름, 전송 시각)
+        self._next_token = 0
+        self._first_sent = None
+        self._good = 0
+        self._cooldown = 0
+        self._lock = threading.Lock()
+
+    @property
+    def scale_percent(self):
+        return self.levels[self.level][0]
+
+    @property
+    def quality(self):
+        return self.levels[self.level][1]
+
+    @property
+    def interval_s(self):
+        return self.levels[self.level][2]
+
+    def track_emit(self, room_id=None):
+        """emit 직전에 호출, sio.emit(..., callback=...)에 넘길 ack 콜백 반환"""
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            now = time.time()
+            self._pending[token] = (room_id, now)
+            if self._first_sent is None:
+                self._first_sent = now
+
+        def on_ack(*args):
+            self._on_ack(token)
+        return on_ack
+
+    def _on_ack(self, token):
+        with self._lock:
+            entry = self._pending.pop(token, None)
+            if entry is None:
+                return
+            sent_at = entry[1]
+            self.ack_supported = True
+            rtt = (time.time() - sent_at) * 1000
+            self.rtt_ms = rtt if self.rtt_ms is None else self.rtt_ms + self.alpha * (rtt - self.rtt_ms)
+
+    def _expire_pending(self, now):
+        """ack_timeout_s 가 지나도 응답이 없는 전송 정리 (ack 미지원 서버 판별 포함)"""
+        expired = [token for token, (_, sent_at) in self._pending.items() if now - sent_at > self.ack_timeout_s]
+        for token in expired:
+            del self._pending[token]
+        if self.ack_supported is None and self._first_sent is not None and expired:
+            self.ack_supported = False
+            log.info("ℹ️ 서버가 frame ack를 보내지 않음, 전송 대기열 길이만으로 화질 조절")
+        if self.ack_supported and expired:
+            # 시간 초과는 왕복 시간이 ack_timeout_s 이상인 것으로 간주
+            self.rtt_ms = max(self.rtt_ms or 0.0, self.ack_timeout_s * 1000)
+
+    def backlog(self):
+        """현재 밀린 전송 수 (Socket.IO 송신 큐, 방별 ack 대기 프레임 중 큰 값)"""
+        try:
+            depth = self.queue_depth()
+        except Exception:
+            depth = 0
+        pending = 0
+        with self._lock:
+            if self.ack_supported:
+                per_room = {}
+                for room_id, _ in self._pending.values():
+                    per_room[room_id] = per_room.get(room_id, 0) + 1
+                pending = max(per_room.values(), default=0)
+        return max(depth, pending)
+
+    def update(self):
+        """프레임 인코딩 전에 호출, 혼잡하면 즉시 한 단계 낮추고 안정되면 천천히 높임"""
+        with self._lock:
+            self._expire_pending(time.time())
+            rtt = self.rtt_ms if self.ack_supported else None
+        backlog = self.backlog()
+
+        congested = backlog > self.max_queue or (rtt is not None and rtt > self.high_rtt_ms)
+        healthy = backlog <= 1 and (rtt is None or rtt < self.low_rtt_ms)
+
+        if self._cooldown > 0:
+            self._cooldown -= 1
+        if congested:
+            self._good = 0
+            if self._cooldown == 0 and self.level < len(self.levels) - 1:
+                self.level += 1
+                self._cooldown = self.step_down_cooldown
+                rtt_text = "-" if rtt is None else f"{rtt:.0f}ms"
+                log.info("📉 스트리밍 화질 낮춤: level=%d %s (backlog=%d, rtt=%s)",
+                         self.level, self.levels[self.level], backlog, rtt_text)
+        elif healthy:
+            self._good += 1
+            if self._good >= self.step_up_after and self.level > 0:
+                self.level -= 1
+                self._good = 0
+                log.info("📈 스트리밍 화질 높임: level=%d %s", self.level, self.levels[self.level])
+        else:
+            self._good = 0
+        return self.level
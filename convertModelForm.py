@@ -1,7 +1,273 @@
-from ultralytics import YOLO
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 
-# Load a YOLOv8n PyTorch model
-model = YOLO("model/best.pt")
+import cv2
+import yaml
 
-# Export the model to NCNN format
-model.export(format="ncnn", imgsz=640)  # creates 'yolov8n_ncnn_model'
\ No newline at end of file
+from frameSource import open_source
+from modelRegistry import MODEL_ROOT, MODEL_SUFFIX, MULTI_RES_SIZES, get_model, parse_imgsz, sized_name
+from ncnnDetector import letterbox
+
+# ncnn 도구 (ncnn 빌드의 tools/ 디렉터리, PATH에 없으면 --ncnn-tools로 지정)
+NCNN_TOOLS = ("ncnnoptimize", "ncnn2table", "ncnn2int8")
+
+
+def export_fp32(weights, imgsz=(640, 640), name=None, root=MODEL_ROOT, force=False):
+    """PyTorch 가중치를 입력 크기 imgsz (h, w)의 fp32 NCNN 모델로 내보내고 model/<name>_ncnn_model 로 옮김"""
+    from ultralytics import YOLO
+
+    h, w = imgsz
+    if h % 32 or w % 32:
+        # Ultralytics가 stride 배수로 올려 내보내므로 이름/비율과 실제 입력 크기가 달라짐
+        raise ValueError(f"입력 크기는 32의 배수여야 합니다: {w}x{h}")
+    name = name or os.path.splitext(os.path.basename(weights))[0]
+    target = os.path.join(root, name + MODEL_SUFFIX)
+    if os.path.exists(target) and not force:
+        raise FileExistsError(f"이미 존재하는 모델 디렉터리: {target} (--force로 덮어쓰기)")
+    os.makedirs(root, exist_ok=True)
+    # Ultralytics는 가중치 옆 <stem>_ncnn_model 에 내보내므로, 가중치 복사본으로 임시 디렉터리에서
+    # 내보내야 기존 모델(model/best.pt -> model/best_ncnn_model)을 덮어쓰거나 옮기지 않음
+    # (임시 디렉터리는 root 아래에 두어 완성된 모델을 rename 으로 교체)
+    with tempfile.TemporaryDirectory(prefix=".export_", dir=root) as work_dir:
+        copied = os.path.join(work_dir, os.path.basename(weights))
+        shutil.copy2(weights, copied)
+        exported = YOLO(copied).export(format="ncnn", imgsz=h if h == w else [h, w])
+        install_model_dir(exported, target)
+    print(f"📦 fp32 NCNN 내보내기 완료: {target}")
+    return get_model(target)
+
+
+def install_model_dir(staging, target):
+    """완성된 모델 디렉터리 staging으로 target을 교체 (변환이 모두 성공한 뒤에만 기존 모델을 치움)
+
+    staging과 target은 같은 파일 시스템에 있어야 함 (디렉터리 rename)
+    """
+    backup = None
+    if os.path.exists(target):
+        backup = target + ".old"
+        if os.path.exists(backup):
+            shutil.rmtree(backup)
+        os.replace(target, backup)
+    try:
+        os.replace(staging, target)
+    except OSError:
+        if backup is not None:
+            os.replace(backup, target)
+        raise
+    if backup is not None:
+        shutil.rmtree(backup)
+
+
+def frame_count(source):
+    """녹화 클립의 전체 프레임 수 (모르면 0)"""
+    if hasattr(source, "files"):
+        return len(source.files)
+    if hasattr(source, "cap"):
+        return int(source.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    return 0
+
+
+def collect_calibration_frames(clips, imgsz, out_dir, count=200):
+    """녹화된 횡단보도 클립에서 고르게 프레임을 뽑아 입력 크기로 레터박스한 PNG와 목록 파일 생성
+
+    ncnn2table은 이미지를 입력 크기로 그냥 늘려 읽으므로, 추론과 같은 레터박스를 미리 적용해 둠
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    per_clip = max(1, count // len(clips))
+    paths = []
+    for clip_index, clip in enumerate(clips):
+        source = open_source(clip)
+        if not source.isOpened() or getattr(source, "live", True):
+            raise RuntimeError(f"녹화 클립을 열 수 없습니다: {clip}")
+        stride = max(1, frame_count(source) // per_clip)
+        taken = 0
+        index = 0
+        try:
+            while taken < per_clip:
+                ret, frame = source.read()
+                if not ret:
+                    break
+                if index % stride == 0:
+                    canvas, _, _, _ = letterbox(frame, imgsz)
+                    path = os.path.join(out_dir, f"{clip_index:02d}_{index:06d}.png")
+                    cv2.imwrite(path, canvas)
+                    paths.append(os.path.abspath(path))
+                    taken += 1
+                index += 1
+        finally:
+            source.release()
+        print(f"🖼️ {clip}: 보정 프레임 {taken}개 (간격 {stride})")
+    if not paths:
+        raise RuntimeError("보정 프레임이 없습니다")
+    list_path = os.path.join(out_dir, "imagelist.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(paths) + "\n")
+    return list_path, len(paths)
+
+
+def find_tools(tools_dir=None):
+    """ncnnoptimize/ncnn2table/ncnn2int8 실행 파일 경로"""
+    found = {}
+    for tool in NCNN_TOOLS:
+        path = shutil.which(tool, path=tools_dir) if tools_dir else shutil.which(tool)
+        if path is None:
+            raise FileNotFoundError(f"{tool} 실행 파일을 찾을 수 없습니다 (ncnn tools 빌드 후 --ncnn-tools로 지정)")
+        found[tool] = path
+    return found
+
+
+def run_tool(args):
+    print(f"⚙️ {os.path.basename(args[0])} 실행 중...")
+    completed = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{os.path.basename(args[0])} 실패 (exit {completed.returncode}):\n{completed.stdout[-2000:]}")
+    return completed.stdout
+
+
+def quantize_int8(info, list_path, tools, method="kl", threads=4, force=False):
+    """fp32 NCNN 모델을 보정 테이블로 INT8 양자화해 model/<name>_int8_ncnn_model 생성"""
+    target = os.path.join(os.path.dirname(info.path), f"{info.name}_int8{MODEL_SUFFIX}")
+    if os.path.exists(target) and not force:
+        raise FileExistsError(f"이미 존재하는 모델 디렉터리: {target} (--force로 덮어쓰기)")
+    # 도구가 실패하거나 중단돼도 배포된 모델이 남도록 옆 임시 디렉터리에 만든 뒤 교체
+    staging = tempfile.mkdtemp(prefix=f".{info.name}_int8_", dir=os.path.dirname(info.path))
+    try:
+        build_int8(info, list_path, tools, staging, method, threads)
+        install_model_dir(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    print(f"📦 INT8 양자화 완료: {target}")
+    return get_model(target)
+
+
+def build_int8(info, list_path, tools, target, method="kl", threads=4):
+    """ncnnoptimize -> ncnn2table -> ncnn2int8 로 target 디렉터리에 INT8 모델과 metadata.yaml 생성"""
+    # 중간 산출물(최적화 모델, 보정 테이블)은 보정 프레임과 함께 두어 배포 디렉터리에 섞이지 않게 함
+    work_dir = os.path.dirname(list_path)
+    opt_param = os.path.join(work_dir, "model-opt.param")
+    opt_bin = os.path.join(work_dir, "model-opt.bin")
+    table = os.path.join(work_dir, "model.table")
+    in_h, in_w = info.imgsz
+
+    # 레이어 융합 후 보정해야 양자화 오차가 줄어듦 (마지막 인자 0: fp32 저장)
+    run_tool([tools["ncnnoptimize"], info.param_path, info.bin_path, opt_param, opt_bin, "0"])
+    # pixel은 모델 입력 형식 (ncnn2table이 BGR 이미지를 읽어 이 형식으로 변환), shape는 [w,h,c]
+    run_tool([
+        tools["ncnn2table"], opt_param, opt_bin, list_path, table,
+        "mean=[0,0,0]", "norm=[0.003922,0.003922,0.003922]",
+        f"shape=[{in_w},{in_h},3]", "pixel=RGB", f"thread={threads}", f"method={method}",
+    ])
+    run_tool([tools["ncnn2int8"], opt_param, opt_bin,
+              os.path.join(target, "model.ncnn.param"), os.path.join(target, "model.ncnn.bin"), table])
+
+    metadata = dict(info.metadata)
+    metadata["args"] = dict(metadata.get("args") or {}, int8=True, half=False)
+    metadata["description"] = f"{metadata.get('description', info.name)} (ncnn INT8, {method} 보정)"
+    with open(os.path.join(target, "metadata.yaml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump(metadata, f, allow_unicode=True, sort_keys=False)
+
+
+def compare_models(fp32_model, int8_model, clip, threads=4, max_frames=0, iou_threshold=0.5):
+    """같은 클립으로 fp32/int8 지연 시간과 탐지 일치율 비교 (모델은 이름 또는 디렉터리 경로)"""
+    # fp32 내보내기만 할 때(Windows 학습 PC 등)는 벤치마크 모듈이 필요 없으므로 여기서 import
+    from benchModels import bench_isolated, detection_agreement
+
+    common = dict(clip=clip, backend="ncnn", threads=threads, max_frames=max_frames, keep_detections=True)
+    fp32 = bench_isolated(name=fp32_model, **common)
+    int8 = bench_isolated(name=int8_model, **common)
+    agreement = detection_agreement(fp32.pop("frame_detections"), int8.pop("frame_detections"),
+                                    get_model(fp32_model).names, iou_threshold)
+    return {
+        "clip": clip,
+        "fp32": fp32,
+        "int8": int8,
+        "speedup": round(fp32["p50_ms"] / int8["p50_ms"], 3) if int8["p50_ms"] else 0.0,
+        "agreement": agreement,
+    }
+
+
+def print_comparison(report, min_f1):
+    fp32, int8, agreement = report["fp32"], report["int8"], report["agreement"]
+    print(f"{'':6s} {'p50(ms)':>8s} {'p95(ms)':>8s} {'FPS':>6s} {'RSS(MB)':>8s}")
+    for label, row in (("fp32", fp32), ("int8", int8)):
+        print(f"{label:6s} {row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['fps']:6.1f} {row['peak_rss_mb']:8.1f}")
+    print(f"⚡ 속도 향상 x{report['speedup']:.2f}")
+    print(f"🎯 탐지 일치율 (IoU≥{agreement['iou_threshold']}): recall={agreement['recall']:.3f} "
+          f"precision={agreement['precision']:.3f} F1={agreement['f1']:.3f} 평균 IoU={agreement['mean_iou']:.3f}")
+    for name, recall in agreement["class_recall"].items():
+        print(f"   {name}: recall={recall:.3f}")
+    if report["accepted"]:
+        print(f"✅ F1 {agreement['f1']:.3f} ≥ {min_f1}: 배포 가능")
+    else:
+        print(f"⚠️ F1 {agreement['f1']:.3f} < {min_f1}: fp32 모델 유지 권장")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO -> NCNN fp32 내보내기 및 INT8 보정/양자화")
+    parser.add_argument("weights", nargs="?", default="model/best.pt", help="PyTorch 가중치 (.pt)")
+    parser.add_argument("--imgsz", default="640", help="입력 크기 (640 또는 가로x세로 640x320)")
+    parser.add_argument("--sizes", nargs="+", help="여러 입력 크기로 내보내기, 이름 뒤에 크기가 붙음 (예: 320x160 512x256 640x320)")
+    parser.add_argument("--multi-res", action="store_true", help=f"{' '.join(MULTI_RES_SIZES)} 전체 내보내기")
+    parser.add_argument("--name", help="등록할 모델 이름 (기본: 가중치 파일 이름)")
+    parser.add_argument("--from-model", help="내보내기 없이 이미 등록된 fp32 모델을 양자화")
+    parser.add_argument("--int8", action="store_true", help="INT8 보정/양자화 실행")
+    parser.add_argument("--calib", nargs="+", default=[], help="보정용 녹화 클립 (영상 파일 또는 JPEG 디렉터리)")
+    parser.add_argument("--calib-frames", type=int, default=200)
+    parser.add_argument("--method", choices=["kl", "aciq", "eq"], default="kl", help="ncnn2table 보정 방식")
+    parser.add_argument("--ncnn-tools", help="ncnnoptimize/ncnn2table/ncnn2int8가 있는 디렉터리")
+    parser.add_argument("--report-clip", help="fp32/int8 비교용 클립 (기본: 첫 번째 보정 클립)")
+    parser.add_argument("--max-frames", type=int, default=0, help="비교 시 측정 프레임 수 (0: 클립 전체)")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--min-f1", type=float, default=0.9, help="이 F1 이상이면 배포 가능으로 판정")
+    parser.add_argument("--force", action="store_true", help="기존 모델 디렉터리 덮어쓰기")
+    args = parser.parse_args()
+
+    if args.int8 and not args.calib:
+        parser.error("--int8 에는 --calib 클립이 필요합니다")
+
+    if args.from_model:
+        infos = [get_model(args.from_model)]
+    else:
+        base = args.name or os.path.splitext(os.path.basename(args.weights))[0]
+        sizes = MULTI_RES_SIZES if args.multi_res else args.sizes
+        if sizes:
+            imgszs = [parse_imgsz(size) for size in sizes]
+            infos = [export_fp32(args.weights, imgsz, sized_name(base, imgsz), force=args.force) for imgsz in imgszs]
+        else:
+            infos = [export_fp32(args.weights, parse_imgsz(args.imgsz), base, force=args.force)]
+    if len(infos) > 1:
+        print(f"📐 내보낸 모델: {', '.join(info.name for info in infos)} "
+              f"(장치마다 benchModels.py --json bench/<장치 이름>.json 으로 측정하면 실행 시 입력 크기 자동 선택)")
+    if not args.int8:
+        return 0
+
+    tools = find_tools(args.ncnn_tools)
+    accepted = True
+    for info in infos:
+        # 입력 크기마다 레터박스가 다르므로 보정 프레임도 모델별로 생성
+        # (모델 디렉터리(*_ncnn_model) 밖에 두어 레지스트리/배포 대상에 섞이지 않도록 함)
+        calib_dir = os.path.join(os.path.dirname(info.path), f"{info.name}_calib_frames")
+        list_path, frames = collect_calibration_frames(args.calib, info.imgsz, calib_dir, args.calib_frames)
+        int8_info = quantize_int8(info, list_path, tools, method=args.method, threads=args.threads, force=args.force)
+
+        report = compare_models(info.path, int8_info.path, args.report_clip or args.calib[0],
+                                threads=args.threads, max_frames=args.max_frames)
+        report["calibration"] = {"clips": args.calib, "frames": frames, "method": args.method}
+        report["accepted"] = report["agreement"]["f1"] >= args.min_f1
+        accepted = accepted and report["accepted"]
+        print_comparison(report, args.min_f1)
+        report_path = os.path.join(int8_info.path, "quant_report.json")
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 비교 결과 저장: {report_path}")
+    return 0 if accepted else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+ZONE_NAMES = ("waiting", "crosswalk", "roadway")
+
+
+class CrosswalkZones:
+    """장치별 관심 영역(대기 구역/횡단보도/차도) 다각형으로 추론 입력을 잘라내고, 구역별로 클래스를 거름
+
+    config 형식 (좌표는 size 해상도 기준 픽셀, 실제 프레임 크기에 맞춰 자동 변환):
+    {
+      "size": [1280, 640],
+      "zones": {"waiting": [[x, y], ...], "crosswalk": [...], "roadway": [...]},
+      "class_zones": {"fallen": ["roadway"], "whiteCane": ["waiting"]},
+      "padding": 16,
+      "mask_outside": true
+    }
+    class_zones에 없는 클래스는 잘라낸 영역 안 어디서든 허용
+    """
+
+    def __init__(self, config, names):
+        self.zone_names = [name for name in ZONE_NAMES if name in config["zones"]]
+        self.zone_names += [name for name in config["zones"] if name not in self.zone_names]
+        if len(self.zone_names) > 8:
+            raise ValueError("구역은 최대 8개까지 지원합니다")
+        self.size = tuple(config.get("size", (0, 0)))
+        self.polygons = [np.asarray(config["zones"][name], dtype=np.float64).reshape(-1, 2)
+                         for name in self.zone_names]
+        self.padding = int(config.get("padding", 16))
+        self.mask_outside = bool(config.get("mask_outside", True))
+
+        # class_id로 바로 인덱싱하는 허용 구역 비트 (-1: 제한 없음)
+        bits = {name: 1 << i for i, name in enumerate(self.zone_names)}
+        self.class_zone_bits = np.full(max(names) + 1 if names else 0, -1, dtype=np.int16)
+        for class_name, zones in config.get("class_zones", {}).items():
+            for class_id, name in names.items():
+                if name == class_name:
+                    self.class_zone_bits[int(class_id)] = sum(bits[zone] for zone in zones)
+
+        self.shape = None
+        self.rect = None  # (x0, y0, x1, y1) 잘라낼 영역
+        self.labels = None  # 프레임 크기 구역 비트 맵 (uint8)
+        self._crop_mask = None
+        self._buffer = None
+
+    @classmethod
+    def load(cls, path, names):
+        """JSON 설정 파일을 읽어 생성 (파일이 없으면 None: 전체 프레임 사용)"""
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), names)
+
+    def _build(self, shape):
+        """프레임 크기가 정해지면 구역 비트 맵과 잘라낼 영역을 한 번만 계산"""
+        height, width = shape[:2]
+        scale = np.array([width / self.size[0], height / self.size[1]]) if all(self.size) else np.ones(2)
+        self.labels = np.zeros((height, width), dtype=np.uint8)
+        points = []
+        for i, polygon in enumerate(self.polygons):
+            pts = np.round(polygon * scale).astype(np.int32)
+            layer = np.zeros((height, width), dtype=np.uint8)
+            cv2.fillPoly(layer, [pts], 1 << i)
+            self.labels |= layer
+            points.append(pts)
+
+        x, y, w, h = cv2.boundingRect(np.concatenate(points))
+        x0 = max(x - self.padding, 0)
+        y0 = max(y - self.padding, 0)
+        x1 = min(x + w + self.padding, width)
+        y1 = min(y + h + self.padding, height)
+        self.rect = (x0, y0, x1, y1)
+        self.shape = shape
+        if self.mask_outside:
+            # 패딩 포함 다각형 바깥은 검게 칠해 먼 차선/건물 오탐을 줄임
+            union = (self.labels > 0).astype(np.uint8)
+            if self.padding:
+                kernel = np.ones((2 * self.padding + 1, 2 * self.padding + 1), np.uint8)
+                union = cv2.dilate(union, kernel)
+            self._crop_mask = np.ascontiguousarray(union[y0:y1, x0:x1])
+            self._buffer = np.zeros((y1 - y0, x1 - x0) + tuple(shape[2:]), dtype=np.uint8)
+        area = (x1 - x0) * (y1 - y0) / float(width * height)
+        log.info("🗺️ 관심 영역: %s, 추론 영역 %dx%d (전체의 %.0f%%)", self.zone_names, x1 - x0, y1 - y0, area * 100)
+
+    def prepare(self, frame):
+        """추론에 넣을 영역 반환 (잘라내기는 복사 없는 뷰, 마스킹 시 미리 할당한 버퍼에 기록)"""
+        if self.shape != frame.shape:
+            self._build(frame.shape)
+        x0, y0, x1, y1 = self.rect
+        crop = frame[y0:y1, x0:x1]
+        if not self.mask_outside:
+            return crop
+        # 마스크 바깥 픽셀은 버퍼 할당 시 0으로 채운 그대로 유지됨
+        cv2.copyTo(crop, self._crop_mask, self._buffer)
+        return self._buffer
+
+    def zone_bits(self, xyxy):
+        """박스 아래쪽 중앙(발 위치)이 속한 구역 비트"""
+        height, width = self.labels.shape
+        x = np.clip(((xyxy[:, 0] + xyxy[:, 2]) * 0.5).astype(np.int64), 0, width - 1)
+        y = np.clip(xyxy[:, 3].astype(np.int64), 0, height - 1)
+        return self.labels[y, x]
+
+    def apply(self, cls, ids, conf, xyxy):
+        """잘라낸 영역 좌표를 전체 프레임 좌표로 되돌리고 구역 조건에 맞지 않는 탐지 제거"""
+        x0, y0, _, _ = self.rect
+        xyxy = xyxy + np.array([x0, y0, x0, y0], dtype=xyxy.dtype)
+        required = self.class_zone_bits[cls]
+        keep = (required < 0) | ((self.zone_bits(xyxy) & required) != 0)
+        return cls[keep], ids[keep], conf[keep], xyxy[keep]
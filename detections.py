@@ -0,0 +1,125 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+def to_numpy(values):
+    """torch 텐서(Ultralytics) 또는 NumPy 배열(ncnn 백엔드)을 NumPy 배열로 변환"""
+    if values is None:
+        return None
+    if hasattr(values, "cpu"):
+        return values.cpu().numpy()
+    return np.asarray(values)
+
+
+def extract_detections(result):
+    """Results.boxes 전체를 한 번에 (cls, ids, conf, xyxy) 배열로 변환 (id 없는 박스는 -1)"""
+    boxes = result.boxes
+    cls = to_numpy(boxes.cls).astype(np.int32, copy=False)
+    conf = to_numpy(boxes.conf).astype(np.float32, copy=False)
+    xyxy = to_numpy(boxes.xyxy).astype(np.float32, copy=False).reshape(-1, 4)
+    ids = to_numpy(boxes.id)
+    if ids is None:
+        ids = np.full(len(cls), -1, dtype=np.int64)
+    else:
+        ids = ids.astype(np.int64)
+    return cls, ids, conf, xyxy
+
+
+def class_mask(names, class_names):
+    """class_id로 바로 인덱싱할 수 있는 대상 클래스 여부 배열 (문자열 비교는 모델 로드 시 한 번만)"""
+    mask = np.zeros(max(names) + 1 if names else 0, dtype=bool)
+    for class_id, name in names.items():
+        mask[int(class_id)] = name in class_names
+    return mask
+
+
+def class_ids(names, class_names):
+    """이름 목록에 해당하는 class_id 배열"""
+    return np.flatnonzero(class_mask(names, class_names)).astype(np.int32)
+
+
+_COLORS = [(56, 56, 255), (151, 157, 255), (31, 112, 255), (29, 178, 255), (49, 210, 207),
+           (10, 249, 72), (23, 204, 146), (134, 219, 61), (52, 147, 26), (187, 212, 0)]
+
+
+def draw_detections(img, cls, ids, conf, xyxy, names):
+    """탐지 박스와 라벨을 img 위에 직접 그림"""
+    for i in range(len(cls)):
+        class_id = int(cls[i])
+        x1, y1, x2, y2 = (int(v) for v in xyxy[i])
+        color = _COLORS[class_id % len(_COLORS)]
+        label = names.get(class_id, str(class_id))
+        if ids is not None and ids[i] >= 0:
+            label = f"id:{int(ids[i])} {label}"
+        label = f"{label} {conf[i]:.2f}"
+        cv2.rectangle(img, (x1, y1), (x2, y2), color, 2, cv2.LINE_AA)
+        (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+        top = max(y1 - th - 4, 0)
+        cv2.rectangle(img, (x1, top), (x1 + tw + 2, top + th + 4), color, -1)
+        cv2.putText(img, label, (x1 + 1, top + th + 1), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                    (255, 255, 255), 1, cv2.LINE_AA)
+    return img
+
+
+def draw_fps(img, fps):
+    """오른쪽 위에 FPS 표시"""
+    text = f'FPS: {fps:.1f}'
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    text_size = cv2.getTextSize(text, font, 1, 2)[0]
+    text_x = img.shape[1] - text_size[0] - 10
+    text_y = text_size[1] + 10
+    cv2.putText(img, text, (text_x, text_y), font, 1, (255, 255, 255), 2, cv2.LINE_AA)
+    return img
+
+
+class AnnotatedFrame:
+    """원본 프레임 + 탐지 배열만 보관하고, 스트리밍/스냅샷/화면 출력이 요청할 때만 한 번 그림
+
+    frame 자리에 링 버퍼 FrameRef를 넘기면 복사 없이 슬롯을 그대로 사용하고,
+    참조 카운트(retain/release)가 0이 되는 순간 슬롯을 링 버퍼에 반납
+    """
+
+    def __init__(self, frame, cls, ids, conf, xyxy, names, fps=None):
+        self._frame_ref = frame if hasattr(frame, "release") else None
+        self.frame = frame.frame if self._frame_ref is not None else frame
+        self.detections = (cls, ids, conf, xyxy)
+        self.names = names
+        self.fps = fps
+        self._rendered = None
+        self._refs = 1
+        self._lock = threading.Lock()
+
+    def retain(self):
+        with self._lock:
+            if self._refs <= 0:
+                raise RuntimeError("이미 해제된 프레임입니다")
+            self._refs += 1
+        return self
+
+    def release(self):
+        with self._lock:
+            self._refs -= 1
+            released = self._refs == 0
+            if released:
+                self.frame = None
+        if released and self._frame_ref is not None:
+            self._frame_ref.release()
+
+    def render(self):
+        with self._lock:
+            if self._rendered is None:
+                if self.frame is None:
+                    raise RuntimeError("이미 해제된 프레임입니다")
+                img = self.frame.copy()
+                draw_detections(img, *self.detections, self.names)
+                if self.fps is not None:
+                    draw_fps(img, self.fps)
+                self._rendered = img
+            return self._rendered
+
+
+def render_frame(item):
+    """AnnotatedFrame이면 그려서, 이미 이미지면 그대로 반환"""
+    return item.render() if hasattr(item, "render") else item
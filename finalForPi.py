@@ -1,17 +1,42 @@
+from lazyImport import lazy_module, DeferredClient, StartupTimer
+import argparse
+import logging
 import cv2
-from ultralytics import YOLO
-import socketio
-import base64
+import numpy as np
 import threading
 import platform
 import time
 import json
-import requests
 from datetime import datetime, timedelta
-import pygame
+from frameRing import FrameSlot
+from frameSource import open_source, start_capture
+from frameScheduler import AdaptiveFrameSkip
+from modelRegistry import get_model
+from trackStore import TrackStore
+from detections import AnnotatedFrame, extract_detections, class_mask, class_ids
+from crosswalkZones import CrosswalkZones
+from multiCamera import CameraStream, CameraPoller, infer_frame
+from processPipeline import ProcessPipeline, default_workers
+from inputSizeSelector import InputSizeSelector, ModelSwitcher
+from ncnnDetector import IouTracker
+from snapshotService import SnapshotService
+from streamEncoder import StreamEncoder
+from bitrateController import BitrateController
+from trafficReporter import TrafficReporter
+from populationStats import PopulationStats
+from audioCues import AudioCueEngine
+from alertScheduler import AlertScheduler
+from stageMetrics import StageMetrics, MetricsServer
+from logSetup import setup_logging
+
+# 무거운 모듈은 처음 사용할 때 import (부팅~첫 탐지 시간 단축)
+ultralytics = lazy_module("ultralytics")
+socketio = lazy_module("socketio")
+
+log = logging.getLogger("detector")
 
 # Socket.IO 클라이언트 인스턴스 생성
-sio = socketio.Client()
+sio = DeferredClient(socketio)
 id = "9"
 cid = "26"
 idCid = id + "&" + cid
@@ -21,9 +46,9 @@ room = ""
 # 전역 변수
 running = True
 cap = None
-object_states = {}
-frame_lock = threading.Lock()
-current_frame = None
+capture = None
+object_states = TrackStore()  # (class_id, track_id) -> 체류 상태
+frame_slot = FrameSlot()  # 탐지 스레드가 공개하는 최신 프레임 (복사 없이 참조 카운트로 공유)
 room_states = {}
 population = 0
 last_sent_time = datetime.now()
@@ -31,270 +56,636 @@ detection_duration = 3
 target_classes = ['guideDog', 'dog', 'fallen', 'whiteCane', 'carAccident', 'person', 'wheelChair', 'crutches', 'gudieWalker']
 min_detections = 2
 population_window = timedelta(seconds=120)
+population_stats = PopulationStats(window_s=population_window.total_seconds())  # 구간별 초당 인원/체류 시간 통계
 active_person_ids = {}
-is_setTime_running = False  # setTime 실행 상태를 추적
-
-# pygame 초기화
-try:
-    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=4096)
-    print("🎵 pygame.mixer 초기화 완료 (frequency=44100, buffer=4096)")
-except Exception as e:
-    print(f"❌ pygame.mixer 초기화 에러: {e}")
-
-def setTime(class_name):
-    """오디오 재생 시퀀스 처리"""
-    global is_setTime_running
-
-    # setTime이 이미 실행 중이라면 새 호출을 무시
-    if is_setTime_running:
-        print(f"ℹ️ setTime({class_name}) 호출 무시: 이미 실행 중")
-        return
-
-    # setTime 실행 시작
-    is_setTime_running = True
-    try:
-        if class_name == 'guideDog' or class_name == 'whiteCane':
-            try:
-                # wait.mp3 재생 (12초 대기)
-                pygame.mixer.music.load("wait.mp3")  # 파일 경로 수정 필요
-                pygame.mixer.music.play()
-                print("▶️ wait.mp3 재생 중...")
-                time.sleep(12)
-
-                # done.mp3 재생 (4초 대기)
-                pygame.mixer.music.load("mp3/done.mp3")  # 파일 경로 수정 필요
-                pygame.mixer.music.play()
-                print("▶️ done.mp3 재생 중...")
-                time.sleep(3)
-
-                # beep.mp3 30초 동안 반복 재생 (7초 파일 기준 약 4~5회)
-                BEEP_DURATION = 7  # beep.mp3 길이 (초)
-                PLAY_DURATION = 20  # 총 재생 시간 (초)
-                start_time = time.time()
-                play_count = 0
-
-                pygame.mixer.music.load("mp3/beep.mp3")  # 파일 경로 수정 필요
-                print("▶️ beep.mp3 재생 시작 (30초 동안 반복, 예상 횟수: ~4-5회)")
-
-                while time.time() - start_time < PLAY_DURATION:
-                    if not pygame.mixer.music.get_busy():
-                        pygame.mixer.music.play()
-                        play_count += 1
-
-                pygame.mixer.music.stop()
-                print(f"⏹️ beep.mp3 재생 중지 (총 {play_count}회 반복)")
-            except FileNotFoundError as e:
-                print(f"❌ 오디오 파일 로드 에러: {e}")
-            except Exception as e:
-                print(f"❌ 오디오 재생 에러: {e}")
-        elif class_name == 'crutches' or class_name == 'wheelChair':
-            try:
-                pygame.mixer.music.load("wait.mp3")  # 파일 경로 수정 필요
-                pygame.mixer.music.play()
-                print("▶️ wait.mp3 재생 중...")
-                time.sleep(12)
-
-                pygame.mixer.music.load("mp3/plz.mp3")  # 파일 경로 수정 필요
-                print("▶️ plz.mp3 재생 중...")
-                PLAY_DURATION = 25  # 총 재생 시간 (초)
-                start_time = time.time()
-                play_count = 0
-
-                while time.time() - start_time < PLAY_DURATION:
-                    if not pygame.mixer.music.get_busy():
-                        pygame.mixer.music.play()
-                        play_count += 1
-                        time.sleep(10)
-
-                pygame.mixer.music.stop()
-                print(f"⏹️ plz.mp3 재생 중지 (총 {play_count}회 반복)")
-            except FileNotFoundError as e:
-                print(f"❌ 오디오 파일 로드 에러: {e}")
-            except Exception as e:
-                print(f"❌ 오디오 재생 에러: {e}")
-    finally:
-        # setTime 실행 종료
-        is_setTime_running = False
-        print(f"✅ setTime({class_name}) 실행 완료")
+detection_cpu_budget = 0.6  # 추적 중 탐지가 카메라 프레임 간격 중 쓸 수 있는 비율 (넘으면 프레임 스킵, 나머지는 스트리밍 등)
+model_name = "capstone2.5"  # modelRegistry 이름 또는 모델 디렉터리 경로
+detector_backend = "ultralytics"  # "ncnn": ncnn.Net 직접 사용 (torch/Ultralytics 미사용)
+ncnn_threads = 4  # ncnn 추론 스레드 수 (라즈베리파이 코어 수에 맞춤)
+# 입력 크기 자동 선택: model_name을 계열 이름(capstone3.2)으로 두고 convertModelForm.py --multi-res 로 내보낸
+# capstone3.2_320x160 ... capstone3.2_640x320 중 이 장치의 지연 시간 예산 안에서 가장 해상도가 높은 모델 사용
+latency_budget_ms = 0  # 0이면 사용 안 함 (model_name 고정)
+latency_schedule = [("07:00", "09:30", 120), ("17:00", "19:30", 120)]  # 시간대별 예산 (시작, 끝, ms): 출퇴근 시간엔 더 빠르게
+benchmark_path = f"bench/{platform.node()}.json"  # 이 장치에서 benchModels.py --json 으로 측정한 결과
+model_reselect_interval_s = 60.0  # 시간대가 바뀌어 다른 모델을 골라야 하는지 확인하는 간격
+source_spec = 0  # 카메라 번호, 영상 파일 또는 JPEG 디렉터리 (--source)
+replay_realtime = False  # 파일 재생 시 실제 속도로 재생 (기본: 최고 속도, 프레임 누락 없음)
+replay_output = None  # 재생 결과(프레임별 탐지/시간)를 기록할 JSON Lines 경로
+zones_path = f"zones/{id}_{cid}.json"  # 장치별 관심 영역 설정 (없으면 전체 프레임으로 추론)
+camera_sources = []  # 2개 이상이면 멀티 카메라 모드 (예: ["0", "1", "2", "3"]), 첫 번째 카메라를 스트리밍
+inference_workers = 0  # 0: 단일 프로세스, N: 캡처/추론 워커 N개를 별도 프로세스로 실행 (-1: 코어 수 - 1)
+max_frame_shape = (720, 1280, 3)  # 멀티 프로세스 공유 메모리 슬롯 크기 (이보다 큰 프레임은 처리 불가)
+process_start_method = "spawn"  # 스레드가 도는 중 fork하지 않도록 자식 프로세스는 새로 시작
+# 라즈베리파이에서는 화면 출력 생략 가능
+show_window = platform.system() != "Darwin" and platform.system() != "Linux"
+snapshot_interval_s = 5.0  # debug_frame.jpg 저장 간격 (초)
+snapshots = SnapshotService(frame_slot, "debug_frame.jpg", interval_s=snapshot_interval_s)
+default_stream_tier = "auto"  # 전송 상태에 따라 자동 조절 (고정: "low"/"medium"/"high")
+stream_legacy_base64 = False  # True: 모든 방에 기존 base64 문자열로 전송 (구형 뷰어 호환)
+
+def offer_stream_jpeg(tier, jpeg):
+    """스트리밍용으로 인코딩된 JPEG를 디버그 스냅샷에 재사용"""
+    if tier == default_stream_tier:
+        snapshots.offer_jpeg(jpeg)
+
+def emit_queue_depth():
+    """Socket.IO(engine.io) 송신 큐에 쌓여 있는 패킷 수"""
+    if not sio.connected:
+        return 0
+    queue = getattr(sio.client.eio, "queue", None)
+    return queue.qsize() if queue is not None else 0
+
+log_level = "INFO"  # DEBUG: 박스별/프레임 전송별 로그까지 출력
+log_format = "text"  # "json": journald/수집기용 한 줄 JSON
+log_rate_per_s = 1.0  # INFO 이하 같은 종류 메시지의 초당 출력 수 (버스트 5)
+
+# 단계별 지연 시간 (캡처 대기/추론/추적/상태 갱신/그리기/인코딩/전송)
+stage_metrics = StageMetrics()
+metrics_host = "127.0.0.1"  # Prometheus 텍스트 엔드포인트 (외부 수집 시 "0.0.0.0")
+metrics_port = 9108  # 0이면 HTTP 엔드포인트 사용 안 함
+metrics_emit_interval_s = 10.0  # Socket.IO "metrics" 이벤트 전송 간격 (0이면 전송 안 함)
+
+stream_bitrate = BitrateController(queue_depth=emit_queue_depth)
+stream_encoder = StreamEncoder(frame_slot, on_encoded=offer_stream_jpeg, controller=stream_bitrate,
+                               metrics=stage_metrics)
+
+traffic_url = "http://118.218.212.147:59727/main/api/traffic"
+traffic_spool_path = "traffic_spool.jsonl"  # 전송 실패한 인구 수 보고를 보관했다가 재전송
+traffic_reporter = TrafficReporter(traffic_url, spool_path=traffic_spool_path)
+
+startup_target_s = 20.0  # 부팅~첫 탐지 목표 시간 (초)
+startup = StartupTimer(target_s=startup_target_s)
+startup.mark("imports")
+# 음성 안내 순서: (파일, 구간 길이 초, 반복 간격 초 - None: 한 번, 0: 연속 반복)
+walking_guide_cue = [("wait.mp3", 12, None), ("mp3/done.mp3", 3, None), ("mp3/beep.mp3", 20, 0)]
+mobility_aid_cue = [("wait.mp3", 12, None), ("mp3/plz.mp3", 25, 10)]
+audio_cues = AudioCueEngine({
+    "guideDog": walking_guide_cue,
+    "whiteCane": walking_guide_cue,
+    "crutches": mobility_aid_cue,
+    "wheelChair": mobility_aid_cue,
+})
+# 음성 안내 우선순위 (작을수록 급함): 휠체어/목발 사용자는 재생 중인 안내견/흰지팡이 안내를 선점
+alert_priorities = {"wheelChair": 0, "crutches": 0, "whiteCane": 1, "guideDog": 1}
+alert_scheduler = AlertScheduler(audio_cues, alert_priorities)
+
+def init_audio():
+    """pygame.mixer 초기화 및 안내 음원 미리 디코딩 (첫 탐지 직후 백그라운드 스레드에서 한 번만),
+    초기화 전에 들어온 알림은 끝난 뒤 재생"""
+    ready = audio_cues.init()
+    alert_scheduler.resume()
+    return ready
+
+def load_model(name=None):
+    """설정된 백엔드로 탐지 모델 로드 (model.track() 호출 형태는 동일)"""
+    info = get_model(name or model_name)
+    log.info("📦 모델: %s (imgsz=%s, date=%s)", info.name, info.imgsz, info.date)
+    if detector_backend == "ncnn":
+        from ncnnDetector import NcnnDetector
+        log.info("⚙️ ncnn 백엔드 사용 (threads=%d)", ncnn_threads)
+        return NcnnDetector(info.path, num_threads=ncnn_threads)
+    return ultralytics.YOLO(info.path, task="detect")
+
+def make_input_size_selector():
+    """지연 시간 예산이 설정돼 있으면 이 장치의 벤치마크로 입력 크기 선택기 생성 (아니면 None)"""
+    if latency_budget_ms <= 0:
+        return None
+    selector = InputSizeSelector.load(benchmark_path, model_name, latency_budget_ms, latency_schedule)
+    if selector is None:
+        log.warning(f"⚠️ {benchmark_path}에 {model_name} 계열 측정값이 없어 입력 크기 자동 선택 안 함")
+    return selector
+
+def select_model_name(selector):
+    """선택기가 있으면 지금 시간대 예산에 맞는 모델 이름, 없으면 model_name"""
+    if selector is None:
+        return model_name
+    name, budget, row = selector.select()
+    log_model_choice(selector, name, budget, row)
+    return name
+
+def log_model_choice(selector, name, budget, row):
+    log.info("📐 입력 크기 선택: %s (%dx%d, 배율 %.2f), %s %sms / 예산 %sms", name, row['imgsz'][1], row['imgsz'][0],
+             selector.scale(row), selector.metric, row[selector.metric], budget, extra={"log_key": "model_choice"})
 
 def object_detection():
     """객체 탐지 및 상태 관리 함수"""
-    global running, cap, object_states, current_frame, last_sent_time, population, active_person_ids
+    global running, cap, capture, object_states, last_sent_time, population, active_person_ids
 
+    replay_log = None
+    latencies = []
+    replay_start = time.perf_counter()
     try:
-        cap = cv2.VideoCapture(0)  # 라즈베리파이 카메라 모듈 사용 시 경로 확인
+        cap = open_source(source_spec, 1280, 640, realtime=replay_realtime)  # 라즈베리파이 카메라 모듈 사용 시 경로 확인
         if not cap.isOpened():
-            print("❌ 웹캠을 열 수 없습니다.")
+            log.error(f"❌ 프레임 소스를 열 수 없습니다: {source_spec}")
             running = False
             return
 
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 640)
-
+        selector = make_input_size_selector()
+        active_model = select_model_name(selector)
         try:
-            model = YOLO("model/capstone2.5_ncnn_model")
+            model = load_model(active_model)
         except Exception as e:
-            print(f"❌ YOLO 모델 로드 에러: {e}")
+            log.error(f"❌ YOLO 모델 로드 에러: {e}")
             running = False
             return
-
-        frame_count = 0
-        print("🔍 객체 탐지 시작...")
+        startup.mark("model_loaded")
+        # Ultralytics는 내보낸 입력 크기(직사각형 포함)를 직접 넘겨야 그 크기로 레터박스함
+        model_imgsz = list(get_model(active_model).imgsz)
+        switcher = ModelSwitcher(selector, load_model, active_model, model_reselect_interval_s) if selector else None
+        # 사람은 체류 시간 알림 대상이 아님 (인구 수 집계만)
+        person_class_ids = class_ids(model.names, ['person'])
+        target_mask = class_mask(model.names, target_classes)
+        zones = CrosswalkZones.load(zones_path, model.names)
+
+        # 캡처는 별도 스레드에서 링 버퍼로, 탐지는 항상 최신 프레임만 사용
+        # (슬롯 5개: 쓰기 중/최신/추론 중/공개 중 프레임을 모두 고정해도 하나가 남음)
+        capture = start_capture(cap, slots=5)
+        snapshots.start()
+        replay_log = open(replay_output, "w", encoding="utf-8") if replay_output else None
+        frame_skip = AdaptiveFrameSkip(cpu_budget=detection_cpu_budget)
+        last_seq = 0
+        replay_start = time.perf_counter()
+        log.info("🔍 객체 탐지 시작...")
 
         while running:
-            ret, frame = cap.read()
-            if not ret:
-                print("❌ 웹캠에서 프레임을 읽을 수 없습니다.")
-                break
-
-            frame_count += 1
-            if frame_count % 2 != 0:
+            switched = switcher.poll() if switcher is not None else None
+            if switched is not None:
+                active_model, new_model, budget, row = switched
+                log_model_choice(selector, active_model, budget, row)
+                if hasattr(model, "tracker") and hasattr(new_model, "tracker"):
+                    # 입력 크기와 무관한 IoU 추적기는 그대로 넘겨 track id 유지
+                    new_model.tracker = model.tracker
+                else:
+                    # 추적기가 새로 시작해 id가 재사용되므로 이전 id의 체류 상태와 인구 집계 구간을 마감
+                    object_states = TrackStore()
+                    close_population_window(datetime.now())
+                model = new_model
+                model_imgsz = list(get_model(active_model).imgsz)
+
+            t = time.perf_counter()
+            frame_ref = capture.latest(last_seq + frame_skip.skip, timeout=1.0)
+            t = stage_metrics.lap("capture_wait", t)
+            if frame_ref is None:
+                if getattr(capture, "eof", False):
+                    log.info("🎞️ 재생 완료")
+                    break
+                if capture.failed:
+                    log.error("❌ 웹캠에서 프레임을 읽을 수 없습니다.")
+                    break
                 continue
+            last_seq = frame_ref.seq
+            captured_at = frame_ref.timestamp
+            startup.mark("first_frame")
+            stage_metrics.record("frame_age", (time.time() - captured_at) * 1000)
 
             try:
-                results = model.track(source=frame, conf=0.65, iou=0.45, persist=True)
-                annotated_frame = results[0].plot()
+                # 관심 영역이 있으면 잘라내고(바깥은 마스킹) 추론
+                source = zones.prepare(frame_ref.frame) if zones is not None else frame_ref.frame
+                t = stage_metrics.lap("roi", t) if zones is not None else t
+                results = model.track(source=source, conf=0.65, iou=0.45, persist=True, imgsz=model_imgsz)
+                t = record_model_stages(results[0].speed, t)
+                # 박스 전체를 한 번에 NumPy 배열로 변환하고 대상 클래스는 class_id 마스크로 필터링
+                cls, ids, conf, xyxy = extract_detections(results[0])
+                if zones is not None:
+                    # 전체 프레임 좌표로 되돌리고 구역 조건(예: fallen은 차도에서만)에 맞는 탐지만 남김
+                    cls, ids, conf, xyxy = zones.apply(cls, ids, conf, xyxy)
+                t = stage_metrics.lap("extract", t)
             except Exception as e:
-                print(f"❌ 객체 탐지 처리 에러: {e}")
+                frame_ref.release()
+                log.error(f"❌ 객체 탐지 처리 에러: {e}")
                 continue
 
-            with frame_lock:
-                current_frame = annotated_frame.copy()
+            inference_time = results[0].speed['inference']
+            fps = 1000 / inference_time if inference_time > 0 else 0
+            # 링 버퍼 슬롯을 복사 없이 그대로 공개 (그리기는 소비자가 요청할 때만,
+            # 마지막 참조가 해제되면 슬롯 반납)
+            annotated = AnnotatedFrame(frame_ref, cls, ids, conf, xyxy, model.names, fps)
+            display_frame = annotated.render() if show_window else None
+            frame_slot.publish(annotated)
+            t = stage_metrics.lap("publish", t)
 
-            current_objects = set()
             current_time = time.time()
             current_datetime = datetime.now()
 
-            print("======================")
-            for result in results:
-                for box in result.boxes:
-                    if box.id is None:
-                        continue
-                    class_id = int(box.cls[0])
-                    class_name = result.names[class_id]
-                    obj_id = int(box.id)
-                    print(f"{class_name} (ID: {obj_id}), {box.conf[0]:.2f}, {box.xyxy[0]}")
-                    if class_name in target_classes:
-                        current_objects.add((class_name, obj_id))
-            print("======================")
-
-            manage_population(current_objects, current_datetime)
-
-            for class_name, obj_id in current_objects:
-                obj_key = f"{class_name}_{obj_id}"
-                if obj_key not in object_states:
-                    object_states[obj_key] = {
-                        'class': class_name,
-                        'is_detected': False,
-                        'start_time': 0,
-                        'has_sent': False,
-                        'count': 0
-                    }
-
-                state = object_states[obj_key]
-                state['count'] += 1
-                if state['count'] >= min_detections and not state['is_detected']:
-                    state['start_time'] = current_time
-                    state['is_detected'] = True
-                    print(f"🚀 {class_name} (ID: {obj_id}) 탐지 시작, 시작 시간: {state['start_time']:.2f}")
-
-                if state['is_detected'] and not state['has_sent'] and state['class'] != 'person':
-                    elapsed_time = current_time - state['start_time']
-                    print(f"⏱️ {class_name} (ID: {obj_id}) 경과 시간: {elapsed_time:.2f}초")
-                    if elapsed_time >= detection_duration:
-                        print(f"🚨 {class_name} (ID: {obj_id}) 3초 이상 탐지됨! 메시지 전송...")
-                        data = {
-                            "id": int(id),
-                            "cid": int(cid),
-                            "cls": class_name,
-                        }
-                        try:
-                            json_str = json.dumps(data)
-                            if class_name == 'fallen' or class_name == 'carAccident':
-                                sio.emit("emergency_detected", json_str)
-                                state['has_sent'] = True
-                            else:
-                                # 별도 스레드에서 오디오 재생
-                                threading.Thread(target=setTime, args=(class_name,), daemon=True).start()
-                                state['has_sent'] = True
-                        except Exception as e:
-                            print(f"❌ Socket.IO 메시지 전송 에러: {e}")
-
-            for obj_key in list(object_states.keys()):
-                class_name, obj_id = obj_key.split('_')
-                obj_id = int(obj_id)
-                if (class_name, obj_id) not in current_objects:
-                    state = object_states[obj_key]
-                    if state['is_detected']:
-                        print(f"ℹ️ {class_name} (ID: {obj_id}) 탐지 중단, 상태 리셋")
-                        del object_states[obj_key]
+            target = (ids >= 0) & target_mask[cls]
+            target_cls = cls[target]
+            target_ids = ids[target]
+            person_ids = target_ids[np.isin(target_cls, person_class_ids)]
+
+            # 박스별 출력은 DEBUG 수준에서만 (INFO에서는 초당 한 줄 요약)
+            if log.isEnabledFor(logging.DEBUG):
+                for class_id, obj_id, score, box in zip(cls.tolist(), ids.tolist(), conf.tolist(), xyxy.tolist()):
+                    if obj_id >= 0:
+                        log.debug("%s (ID: %d), %.2f, %s", model.names[class_id], obj_id, score, box)
+            finish_frame(last_seq, (cls, ids, conf, xyxy), model.names, results[0].speed, captured_at,
+                         len(target_ids), len(person_ids), latencies, replay_log)
+            t = stage_metrics.lap("log", t)
+
+            frame_skip.update(results[0].speed, captured_at, tracking=len(target_ids) > 0, seq=last_seq)
+            manage_population(person_ids, current_datetime)
+
+            update_object_states(
+                object_states,
+                target_cls,
+                target_ids,
+                model.names,
+                person_class_ids,
+                current_time,
+            )
+            t = stage_metrics.lap("state", t)
+            stage_metrics.record("frame_total", (time.time() - captured_at) * 1000)
 
-            inference_time = results[0].speed['inference']
-            fps = 1000 / inference_time if inference_time > 0 else 0
-            text = f'FPS: {fps:.1f}'
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            text_size = cv2.getTextSize(text, font, 1, 2)[0]
-            text_x = annotated_frame.shape[1] - text_size[0] - 10
-            text_y = text_size[1] + 10
-            cv2.putText(annotated_frame, text, (text_x, text_y), font, 1, (255, 255, 255), 2, cv2.LINE_AA)
+            if show_window:
+                if not show_frame(display_frame):
+                    break
+                stage_metrics.lap("display", t)
 
-            try:
-                cv2.imwrite("debug_frame.jpg", annotated_frame)
-            except Exception as e:
-                print(f"❌ 디버그 프레임 저장 에러: {e}")
+    except Exception as e:
+        log.error(f"❌ 객체 탐지 에러: {e}")
+    finally:
+        snapshots.stop()
+        frame_slot.clear()
+        cleanup_camera()
+        if replay_log is not None:
+            replay_log.close()
+        report_timings(latencies, time.perf_counter() - replay_start)
+        log.info("🔍 객체 탐지 종료")
+
+def record_model_stages(speed, start):
+    """model.track() 전체 시간과 모델이 보고한 전처리/추론/후처리 시간, 나머지(추적 등)를 기록"""
+    now = time.perf_counter()
+    total_ms = (now - start) * 1000
+    stage_metrics.record("track_call", total_ms)
+    model_ms = 0.0
+    for stage in ("preprocess", "inference", "postprocess"):
+        value = speed.get(stage)
+        if value is not None:
+            stage_metrics.record(f"model_{stage}", value)
+            model_ms += value
+    stage_metrics.record("tracker", max(total_ms - model_ms, 0.0))
+    return now
+
+def multi_camera_detection(specs):
+    """여러 카메라를 한 프로세스에서 처리: 공유 모델 하나로 카메라마다 새 프레임이 오는 대로 추론,
+    추적기/체류 상태/관심 영역은 카메라별로 유지"""
+    global running
+
+    cameras = []
+    poller = None
+    latencies = []
+    wall_start = time.perf_counter()
+    try:
+        for index, spec in enumerate(specs):
+            camera = CameraStream(index, int(spec) if str(spec).isdigit() else spec, 1280, 640,
+                                  realtime=replay_realtime, zones_path=f"zones/{id}_{cid}_cam{index}.json")
+            cameras.append(camera)
+            if not camera.source.isOpened():
+                log.error(f"❌ 프레임 소스를 열 수 없습니다: {spec}")
+                running = False
+                return
+
+        active_model = select_model_name(make_input_size_selector())
+        try:
+            model = load_model(active_model)
+        except Exception as e:
+            log.error(f"❌ YOLO 모델 로드 에러: {e}")
+            running = False
+            return
+        startup.mark("model_loaded")
+        model_imgsz = list(get_model(active_model).imgsz)
+        person_class_ids = class_ids(model.names, ['person'])
+        target_mask = class_mask(model.names, target_classes)
+
+        poller = CameraPoller(cameras).start(model.names)
+        snapshots.start()
+        wall_start = time.perf_counter()
+        log.info("🔍 멀티 카메라 객체 탐지 시작: 카메라 %d대", len(cameras))
+
+        while running:
+            t = time.perf_counter()
+            ready = poller.next_frames(timeout=1.0)
+            t = stage_metrics.lap("camera_wait", t)
+            if ready is None:
+                log.info("🎞️ 모든 카메라 재생 완료")
+                break
+            if not ready:
+                continue
+            startup.mark("first_frame")
 
-            # 라즈베리파이에서는 화면 출력 생략 가능
-            if platform.system() != "Darwin" and platform.system() != "Linux":
+            # 새 프레임이 있는 카메라를 다른 카메라를 기다리지 않고 하나씩 바로 추론
+            round_person_ids = []
+            for camera, frame_ref in ready:
                 try:
-                    cv2.imshow("Camera", annotated_frame)
-                    if cv2.waitKey(1) & 0xFF == ord("q"):
-                        running = False
-                        break
+                    source = camera.zones.prepare(frame_ref.frame) if camera.zones is not None else frame_ref.frame
+                    result = infer_frame(model, source, conf=0.65, iou=0.45, imgsz=model_imgsz)
                 except Exception as e:
-                    print(f"❌ 프레임 표시 에러: {e}")
+                    frame_ref.release()
+                    log.error(f"❌ {camera.name} 추론 에러: {e}")
+                    continue
+                t = stage_metrics.lap("infer", t)
+                current_time = time.time()
+                cls, ids, conf, xyxy = extract_detections(result)
+                if camera.zones is not None:
+                    cls, ids, conf, xyxy = camera.zones.apply(cls, ids, conf, xyxy)
+                # 카메라마다 자기 추적기로 id 부여 (id 범위가 카메라별로 나뉘어 있음)
+                ids = camera.tracker.update(xyxy, cls)
+
+                if camera.index == 0:
+                    inference_time = result.speed['inference']
+                    fps = 1000 / inference_time if inference_time > 0 else 0
+                    frame_slot.publish(AnnotatedFrame(frame_ref, cls, ids, conf, xyxy, model.names, fps))
+                else:
+                    frame_ref.release()
+
+                target = target_mask[cls]
+                target_cls = cls[target]
+                target_ids = ids[target]
+                person_ids = target_ids[np.isin(target_cls, person_class_ids)]
+                latency_ms = finish_frame(frame_ref.seq, (cls, ids, conf, xyxy), model.names, result.speed,
+                                          frame_ref.timestamp, len(target_ids), len(person_ids), latencies,
+                                          camera=camera.name)
+
+                round_person_ids.append(person_ids)
+                update_object_states(camera.states, target_cls, target_ids, model.names, person_class_ids, current_time)
+                stage_metrics.record("frame_total", latency_ms)
+                t = stage_metrics.lap("state", t)
+            # 카메라별 id 범위가 달라 합쳐도 겹치지 않음 (점유 인원은 이번에 처리한 카메라 전체 기준)
+            if round_person_ids:
+                manage_population(np.concatenate(round_person_ids), datetime.now())
+
+    except Exception as e:
+        log.error(f"❌ 멀티 카메라 객체 탐지 에러: {e}")
+    finally:
+        snapshots.stop()
+        frame_slot.clear()
+        if poller is not None:
+            poller.stop()
+        else:
+            for camera in cameras:
+                camera.stop()
+        report_timings(latencies, time.perf_counter() - wall_start)
+        log.info("🔍 멀티 카메라 객체 탐지 종료")
+
+def pipeline_detection(workers):
+    """멀티 프로세스 모드: 캡처/추론은 자식 프로세스에서 병렬로, 이 프로세스는 순서를 맞춘 결과로
+    추적, 체류 시간 상태 갱신, 스트리밍만 담당 (GIL을 나눠 쓰지 않아 모든 코어 사용)"""
+    global running
+
+    pipeline = None
+    replay_log = None
+    latencies = []
+    wall_start = time.perf_counter()
+    try:
+        info = get_model(select_model_name(make_input_size_selector()))
+        workers = workers if workers > 0 else default_workers()
+        # 워커끼리 코어를 나눠 쓰도록 워커당 추론 스레드 수 조정
+        threads = max(1, ncnn_threads // workers)
+        log.info("📦 모델: %s (imgsz=%s, date=%s), 백엔드 %s, 워커 %d개 x 스레드 %d개",
+                 info.name, info.imgsz, info.date, detector_backend, workers, threads)
+        names = info.names
+        person_class_ids = class_ids(names, ['person'])
+        target_mask = class_mask(names, target_classes)
+        # 워커는 추론만 하므로 track id는 순서를 맞춘 뒤 여기서 부여
+        tracker = IouTracker()
+
+        pipeline = ProcessPipeline(
+            source_spec, (detector_backend, info.path, threads), workers=workers,
+            max_frame_shape=max_frame_shape, realtime=replay_realtime, zones_path=zones_path,
+            conf=0.65, iou=0.45, log_level=log_level, log_format=log_format,
+            start_method=process_start_method,
+        ).start()
+        snapshots.start()
+        replay_log = open(replay_output, "w", encoding="utf-8") if replay_output else None
+        fps = 0.0
+        last_done = None
+        wall_start = time.perf_counter()
+
+        while running:
+            t = time.perf_counter()
+            item = pipeline.next(timeout=1.0)
+            t = stage_metrics.lap("pipeline_wait", t)
+            if item is None:
+                if pipeline.finished:
+                    if pipeline.eof:
+                        log.info("🎞️ 재생 완료")
+                    else:
+                        log.error("❌ 캡처 또는 추론 워커가 종료되었습니다.")
                     break
+                continue
+            frame_ref, cls, conf, xyxy, speed = item
+            captured_at = frame_ref.timestamp
+            startup.mark("first_frame")
+            stage_metrics.record("worker_queue", speed.pop("queue", 0.0))
+            for stage, value in speed.items():
+                stage_metrics.record(f"model_{stage}", value)
+
+            ids = tracker.update(xyxy, cls)
+            t = stage_metrics.lap("tracker", t)
+
+            # 워커가 여러 개라 추론 시간이 아닌 실제 처리 간격으로 FPS 표시
+            now = time.perf_counter()
+            if last_done is not None and now > last_done:
+                fps = 0.9 * fps + 0.1 * (1.0 / (now - last_done)) if fps else 1.0 / (now - last_done)
+            last_done = now
+            annotated = AnnotatedFrame(frame_ref, cls, ids, conf, xyxy, names, fps)
+            display_frame = annotated.render() if show_window else None
+            frame_slot.publish(annotated)
+            t = stage_metrics.lap("publish", t)
 
-            time.sleep(0.01)
+            current_time = time.time()
+            current_datetime = datetime.now()
+            target = target_mask[cls]
+            target_cls = cls[target]
+            target_ids = ids[target]
+            person_ids = target_ids[np.isin(target_cls, person_class_ids)]
+            finish_frame(frame_ref.seq, (cls, ids, conf, xyxy), names, speed, captured_at,
+                         len(target_ids), len(person_ids), latencies, replay_log)
+            manage_population(person_ids, current_datetime)
+            update_object_states(object_states, target_cls, target_ids, names, person_class_ids, current_time)
+            t = stage_metrics.lap("state", t)
+            stage_metrics.record("frame_total", (time.time() - captured_at) * 1000)
+
+            if show_window:
+                if not show_frame(display_frame):
+                    break
+                stage_metrics.lap("display", t)
 
     except Exception as e:
-        print(f"❌ 객체 탐지 에러: {e}")
+        log.error(f"❌ 멀티 프로세스 객체 탐지 에러: {e}")
     finally:
-        cleanup_camera()
-        print("🔍 객체 탐지 종료")
+        snapshots.stop()
+        frame_slot.clear()
+        if pipeline is not None:
+            pipeline.stop()
+        if replay_log is not None:
+            replay_log.close()
+        report_timings(latencies, time.perf_counter() - wall_start)
+        log.info("🔍 멀티 프로세스 객체 탐지 종료")
+
+def write_replay_record(f, seq, detections, names, speed, latency_ms):
+    """재생 결과를 프레임 단위 JSON 한 줄로 기록 (탐지 결과는 재생마다 동일, 좌표는 전체 프레임 기준)"""
+    cls, ids, conf, xyxy = detections
+    records = []
+    for class_id, obj_id, score, box in zip(cls.tolist(), ids.tolist(), conf.tolist(), xyxy.tolist()):
+        records.append({
+            "cls": names[class_id],
+            "id": obj_id if obj_id >= 0 else None,
+            "conf": round(score, 4),
+            "xyxy": [round(v, 1) for v in box],
+        })
+    record = {
+        "frame": seq,
+        "detections": records,
+        "speed": {k: round(v, 2) for k, v in speed.items() if v is not None},
+        "latency_ms": round(latency_ms, 2),
+    }
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def finish_frame(seq, detections, names, speed, captured_at, target_count, person_count, latencies,
+                 replay_log=None, camera=None):
+    """탐지 루프 공통 마무리: 요약 로그, 지연 시간/재생 결과 기록, 첫 탐지 시점 기록 (지연 시간 ms 반환)"""
+    inference_ms = speed.get("inference") or 0.0
+    if camera is None:
+        log.info("🔎 탐지 %d개 (추적 대상 %d개, 사람 %d명), 추론 %.1fms",
+                 len(detections[0]), target_count, person_count, inference_ms, extra={"log_key": "frame_summary"})
+    else:
+        log.info("🔎 %s: 탐지 %d개 (추적 대상 %d개, 사람 %d명), 추론 %.1fms", camera,
+                 len(detections[0]), target_count, person_count, inference_ms,
+                 extra={"log_key": f"frame_summary_{camera}"})
+
+    latency_ms = (time.time() - captured_at) * 1000
+    latencies.append(latency_ms)
+    if replay_log is not None:
+        write_replay_record(replay_log, seq, detections, names, speed, latency_ms)
+    if not startup.reported:
+        startup.mark("first_detection")
+        startup.report()
+        # 첫 탐지 이후 백그라운드에서 오디오 미리 초기화
+        threading.Thread(target=init_audio, daemon=True).start()
+    return latency_ms
+
+def show_frame(frame):
+    """로컬 창에 프레임 표시, 'q' 입력이나 표시 에러로 탐지를 멈춰야 하면 False"""
+    global running
+    try:
+        cv2.imshow("Camera", frame)
+        if cv2.waitKey(1) & 0xFF == ord("q"):
+            running = False
+            return False
+    except Exception as e:
+        log.error(f"❌ 프레임 표시 에러: {e}")
+        return False
+    return True
 
-def manage_population(current_objects, current_datetime):
+def report_timings(latencies, wall_s):
+    """처리한 프레임 수와 지연 시간 요약 출력"""
+    if not latencies:
+        return
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    log.info("📈 처리 프레임 %d개, %.1f FPS, 지연 p50=%.1fms p95=%.1fms",
+             len(latencies), len(latencies) / wall_s, p50, p95)
+
+def update_object_states(store, class_ids, track_ids, names, exclude_class_ids, current_time):
+    """탐지된 객체의 체류 시간을 갱신하고 기준 시간을 넘으면 알림 전송"""
+    slots = store.observe(class_ids, track_ids)
+
+    for slot in store.start_dwell(slots, current_time, min_detections).tolist():
+        log.info("🚀 %s (ID: %d) 탐지 시작, 시작 시간: %.2f", names[int(store.class_id[slot])], store.track_id[slot], current_time)
+
+    dwelling = store.dwelling(slots, exclude_class_ids)
+    elapsed = store.elapsed(dwelling, current_time)
+    for slot, elapsed_time in zip(dwelling.tolist(), elapsed.tolist()):
+        log.info("⏱️ %s (ID: %d) 경과 시간: %.2f초", names[int(store.class_id[slot])], store.track_id[slot], elapsed_time)
+
+    for slot in dwelling[elapsed >= detection_duration].tolist():
+        class_name = names[int(store.class_id[slot])]
+        obj_id = int(store.track_id[slot])
+        log.info("🚨 %s (ID: %d) 3초 이상 탐지됨! 메시지 전송...", class_name, obj_id, extra={"log_key": "dwell_alert"})
+        if send_alert(class_name):
+            store.mark_sent(slot)
+
+    for class_id, obj_id in store.expire():
+        log.info("ℹ️ %s (ID: %d) 탐지 중단, 상태 리셋", names[class_id], obj_id)
+
+def send_alert(class_name):
+    """긴급 상황은 서버로 전송, 보행 약자는 음성 안내 재생 (성공 시 True)"""
+    data = {
+        "id": int(id),
+        "cid": int(cid),
+        "cls": class_name,
+    }
+    try:
+        json_str = json.dumps(data)
+        if class_name == 'fallen' or class_name == 'carAccident':
+            sio.emit("emergency_detected", json_str)
+            snapshots.request()
+        else:
+            # 우선순위 큐에 넣고 바로 반환 (재생은 AudioCueEngine 타이머 스레드 하나에서만)
+            alert_scheduler.submit(class_name)
+        return True
+    except Exception as e:
+        log.error(f"❌ Socket.IO 메시지 전송 에러: {e}")
+        return False
+
+def manage_population(person_ids, current_datetime):
     """인구 수 관리 및 전송 함수"""
     global population, last_sent_time, active_person_ids
     try:
-        for class_name, obj_id in current_objects:
-            if class_name == 'person':
-                if obj_id not in active_person_ids:
-                    active_person_ids[obj_id] = {'last_seen': current_datetime, 'count': 0}
-                active_person_ids[obj_id]['last_seen'] = current_datetime
-                active_person_ids[obj_id]['count'] += 1
-                if active_person_ids[obj_id]['count'] == min_detections:
-                    population += 1
-                    print(f"👤 사람 (ID: {obj_id}) 안정적으로 탐지됨, population: {population}")
+        occupancy = 0
+        for obj_id in set(person_ids.tolist()):
+            if obj_id not in active_person_ids:
+                active_person_ids[obj_id] = {'first_seen': current_datetime, 'last_seen': current_datetime, 'count': 0}
+            active_person_ids[obj_id]['last_seen'] = current_datetime
+            active_person_ids[obj_id]['count'] += 1
+            if active_person_ids[obj_id]['count'] == min_detections:
+                population += 1
+                log.info("👤 사람 (ID: %d) 안정적으로 탐지됨, population: %d", obj_id, population)
+            if active_person_ids[obj_id]['count'] >= min_detections:
+                occupancy += 1
+        population_stats.observe(occupancy, current_datetime.timestamp())
 
         expired_ids = [
             obj_id for obj_id, info in active_person_ids.items()
             if (current_datetime - info['last_seen']) > timedelta(seconds=10)
         ]
+        dwell_times = []
         for obj_id in expired_ids:
-            del active_person_ids[obj_id]
-            print(f"🗑️ 사람 (ID: {obj_id}) 탐지 만료, 제거됨")
+            info = active_person_ids.pop(obj_id)
+            if info['count'] >= min_detections:
+                dwell_times.append((info['last_seen'] - info['first_seen']).total_seconds())
+            log.info("🗑️ 사람 (ID: %d) 탐지 만료, 제거됨", obj_id)
+        population_stats.add_dwell(dwell_times)
 
         if current_datetime - last_sent_time >= population_window:
-            send_traffic(population, current_datetime)
+            send_traffic(population, current_datetime, population_stats.flush())
             population = 0
             last_sent_time = current_datetime
-            print("📊 population 초기화 및 전송 완료")
+            log.info("📊 population 초기화 및 전송 요청 완료")
+    except Exception as e:
+        log.error(f"❌ 인구 수 관리 에러: {e}")
+
+def close_population_window(current_datetime):
+    """추적기가 새로 시작될 때: 추적 중인 사람을 모두 떠난 것으로 처리하고 지금까지의 집계를 전송
+    (새 추적기가 재사용하는 id가 이미 집계된 사람과 합쳐지지 않도록)"""
+    global population, last_sent_time, active_person_ids
+    try:
+        population_stats.add_dwell([
+            (info['last_seen'] - info['first_seen']).total_seconds()
+            for info in active_person_ids.values() if info['count'] >= min_detections
+        ])
+        active_person_ids = {}
+        send_traffic(population, current_datetime, population_stats.flush())
+        population = 0
+        last_sent_time = current_datetime
+        log.info("📊 추적기 초기화로 population 집계 구간 마감")
     except Exception as e:
-        print(f"❌ 인구 수 관리 에러: {e}")
+        log.error(f"❌ 인구 수 집계 마감 에러: {e}")
 
-def send_traffic(population, timestamp):
-    """인구 수 데이터를 서버로 전송"""
-    url = "http://118.218.212.147:59727/main/api/traffic"
+def send_traffic(population, timestamp, stats=None):
+    """인구 수 데이터를 전송 큐에 넣음 (실제 전송은 TrafficReporter 스레드에서)"""
     data = {
         "id": {
             "id": id,
@@ -303,27 +694,28 @@ def send_traffic(population, timestamp):
         },
         "population": population
     }
-    headers = {"Content-Type": "application/json"}
-    try:
-        response = requests.post(url, json=data, headers=headers)
-        print(f"📤 인구 수 전송: status={response.status_code}, response={response.text}")
-    except requests.RequestException as e:
-        print(f"❌ 인구 수 전송 에러: {e}")
+    if stats is not None:
+        # 구간 내 점유 인원 최소/최대/평균/백분위와 체류 시간 히스토그램
+        data["stats"] = stats
+    traffic_reporter.report(data)
 
 def cleanup_camera():
     """카메라 리소스 해제"""
-    global cap
+    global cap, capture
     try:
+        if capture is not None:
+            capture.stop()
+            capture = None
         if cap is not None and cap.isOpened():
             cap.release()
-            print("📷 카메라 리소스 해제 완료")
+            log.info("📷 카메라 리소스 해제 완료")
         cv2.destroyAllWindows()
     except Exception as e:
-        print(f"❌ 카메라 리소스 해제 에러: {e}")
+        log.error(f"❌ 카메라 리소스 해제 에러: {e}")
 
 @sio.event
 def connect():
-    print("✅ 서버에 연결됨")
+    log.info("✅ 서버에 연결됨")
 
 @sio.event
 def connection(sessionInfo):
@@ -331,112 +723,192 @@ def connection(sessionInfo):
     try:
         sessionId = sessionInfo
         room = sessionId + idCid
-        print(f"sessionId: {sessionId}, room: {room}")
+        log.info("sessionId: %s, room: %s", sessionId, room, extra={"log_key": "session"})
         sio.emit("connectionSuccess", room)
     except Exception as e:
-        print(f"❌ connection 이벤트 처리 에러: {e}")
+        log.error(f"❌ connection 이벤트 처리 에러: {e}")
 
 @sio.event
 def connect_error(data):
-    print("❌ 연결 실패:", data)
+    log.error(f"❌ 연결 실패: {data}")
 
 @sio.event
 def disconnect():
     global running, room_states
-    print("🔌 서버 연결 종료됨")
+    log.info("🔌 서버 연결 종료됨")
     try:
         running = False
         for room_id in list(room_states.keys()):
             room_states[room_id]["send_frames_enabled"] = False
         cleanup_camera()
     except Exception as e:
-        print(f"❌ disconnect 이벤트 처리 에러: {e}")
+        log.error(f"❌ disconnect 이벤트 처리 에러: {e}")
 
 @sio.on("connected")
 def on_connected():
-    print("🎉 서버로부터 'connected' 이벤트 수신!")
+    log.info("🎉 서버로부터 'connected' 이벤트 수신!")
 
 @sio.on("videoCall")
 def start_sending_frames(data):
     try:
-        room_id = data
-        print(f"room info: {room_id}")
+        # 기존 형식(room_id 문자열)과 {"room_id", "quality"} 형식 모두 지원
+        fmt = "base64" if stream_legacy_base64 else "binary"
+        if isinstance(data, dict):
+            room_id = data.get("room_id")
+            tier = data.get("quality", default_stream_tier)
+            fmt = data.get("format", fmt)
+        else:
+            room_id = data
+            tier = default_stream_tier
+        if tier not in stream_encoder.tiers:
+            tier = default_stream_tier
+        if fmt not in ("binary", "base64"):
+            fmt = "base64"
+        log.info("room info: %s, quality: %s, format: %s", room_id, tier, fmt, extra={"log_key": "room_info"})
         if room_id not in room_states or not room_states[room_id]["send_frames_enabled"]:
-            room_states[room_id] = {"send_frames_enabled": True, "thread": None}
+            room_states[room_id] = {"send_frames_enabled": True, "thread": None, "tier": tier, "format": fmt}
             room_states[room_id]["thread"] = threading.Thread(
                 target=send_frames, args=(room_id,), daemon=True
             )
             room_states[room_id]["thread"].start()
-            print(f"📹 videoCall 이벤트 시작: {room_id}에서 프레임 전송 시작")
+            log.info("📹 videoCall 이벤트 시작: %s에서 프레임 전송 시작", room_id, extra={"log_key": "video_call"})
     except Exception as e:
-        print(f"❌ videoCall 이벤트 처리 에러: {e}")
+        log.error(f"❌ videoCall 이벤트 처리 에러: {e}")
 
 @sio.on("stopVideo")
 def stop_sending_frames(data):
     try:
-        print(f"stopVideo: {data}")
+        log.info("stopVideo: %s", data, extra={"log_key": "stop_video"})
         if data in room_states:
             room_states[data]["send_frames_enabled"] = False
-            print(f"🛑 stopVideo 이벤트 수신: {data}에서 프레임 전송 중단")
+            log.info("🛑 stopVideo 이벤트 수신: %s에서 프레임 전송 중단", data, extra={"log_key": "stop_video"})
     except Exception as e:
-        print(f"❌ stopVideo 이벤트 처리 에러: {e}")
+        log.error(f"❌ stopVideo 이벤트 처리 에러: {e}")
 
 def send_frames(room_id):
-    """프레임 전송 함수 (화질 낮춤)"""
-    global running, current_frame
+    """프레임 전송 함수 (공유 인코더가 만든 데이터를 그대로 전송, 기본은 JPEG 바이너리 첨부)"""
+    global running
+    tier = room_states[room_id]["tier"]
+    fmt = room_states[room_id]["format"]
+    stream_encoder.subscribe(room_id, tier, fmt)
+    last_version = 0
     try:
         while room_states.get(room_id, {}).get("send_frames_enabled", False):
-            with frame_lock:
-                frame = current_frame.copy() if current_frame is not None else None
-            if frame is None:
-                print(f"{room_id} 방에서 프레임 없음, 대기 중...")
-                time.sleep(0.1)
+            payload = stream_encoder.wait_payload(tier, fmt, last_version, timeout=1.0)
+            if payload is None:
+                log.info("%s 방에서 프레임 없음, 대기 중...", room_id)
                 continue
 
-            # 1. 해상도 줄이기 (예: 50%로 축소)
-            scale_percent = 70  # 해상도 축소 비율
-            width = int(frame.shape[1] * scale_percent / 100)
-            height = int(frame.shape[0] * scale_percent / 100)
-            frame_resized = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
-
-            # 2. JPEG 압축률 낮추기 (0~100, 낮을수록 저화질)
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 70]  # 50% 품질
-            _, buffer = cv2.imencode(".jpg", frame_resized, encode_param)
-
-            # 3. Base64로 인코딩
-            frame_data = base64.b64encode(buffer).decode("utf-8")
-            print(f"프레임 전송 시도: room_id={room_id}, 데이터 크기={len(frame_data)}")
-            sio.emit("frame", {"room_id": room_id, "data": frame_data})
-            time.sleep(0.03)
+            last_version, frame_data = payload
+            log.debug("프레임 전송 시도: room_id=%s, 데이터 크기=%d", room_id, len(frame_data))
+            t = time.perf_counter()
+            sio.emit("frame", {"room_id": room_id, "data": frame_data},
+                     callback=stream_bitrate.track_emit(room_id))
+            stage_metrics.lap("emit", t)
     except Exception as e:
-        print(f"❌ 프레임 전송 에러: {e}")
+        log.error(f"❌ 프레임 전송 에러: {e}")
+    finally:
+        stream_encoder.unsubscribe(room_id)
+        stage_metrics.retire()
+
+def send_metrics():
+    """단계별 지연 시간 요약을 주기적으로 Socket.IO "metrics" 이벤트로 전송"""
+    while running:
+        time.sleep(metrics_emit_interval_s)
+        if not sio.connected:
+            continue
+        try:
+            sio.emit("metrics", {"id": int(id), "cid": int(cid), "stages": stage_metrics.snapshot()})
+        except Exception as e:
+            log.error(f"❌ 메트릭 전송 에러: {e}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="스마트 신호등 객체 탐지 클라이언트")
+    parser.add_argument("--source", default="0", help="카메라 번호, 영상 파일 또는 JPEG 디렉터리")
+    parser.add_argument("--realtime", action="store_true", help="파일 재생 시 실제 속도로 재생")
+    parser.add_argument("--offline", action="store_true", help="서버 연결 없이 탐지만 실행 (재생/벤치마크용)")
+    parser.add_argument("--replay-out", help="프레임별 탐지 결과/시간을 기록할 JSON Lines 파일")
+    parser.add_argument("--cameras", help="멀티 카메라 모드: 쉼표로 구분한 카메라 번호/영상 파일 목록 (예: 0,1,2,3)")
+    parser.add_argument("--latency-budget-ms", type=float, default=latency_budget_ms,
+                        help="입력 크기 자동 선택 기본 예산 ms (0: 사용 안 함, model_name은 계열 이름)")
+    parser.add_argument("--bench", default=benchmark_path, help="이 장치의 benchModels.py --json 결과")
+    parser.add_argument("--workers", type=int, default=inference_workers,
+                        help="멀티 프로세스 모드: 추론 워커 프로세스 수 (0: 사용 안 함, -1: 코어 수 - 1)")
+    parser.add_argument("--zones", help=f"관심 영역(대기 구역/횡단보도/차도) JSON 설정 파일 (기본: {zones_path})")
+    parser.add_argument("--log-level", default=log_level, help="로그 수준 (DEBUG/INFO/WARNING/ERROR)")
+    parser.add_argument("--log-format", default=log_format, choices=["text", "json"], help="로그 출력 형식")
+    parser.add_argument("--metrics-host", default=metrics_host, help="Prometheus 메트릭 엔드포인트 주소")
+    parser.add_argument("--metrics-port", type=int, default=metrics_port, help="메트릭 엔드포인트 포트 (0: 사용 안 함)")
+    args = parser.parse_args()
+    # 멀티 카메라 모드는 자체 추론 루프와 카메라별 관심 영역(zones/{id}_{cid}_cam<번호>.json)을 쓰므로
+    # 다른 모드 옵션과 섞이면 한쪽이 조용히 무시되지 않도록 거부
+    cameras = args.cameras.split(",") if args.cameras else camera_sources
+    if len([spec for spec in cameras if spec.strip()]) > 1:
+        if args.workers:
+            parser.error("멀티 카메라 모드(--cameras)와 멀티 프로세스 모드(--workers)는 함께 쓸 수 없습니다")
+        if args.replay_out:
+            parser.error("멀티 카메라 모드(--cameras)는 --replay-out을 지원하지 않습니다")
+        if args.zones:
+            parser.error("멀티 카메라 모드(--cameras)는 카메라별 관심 영역 파일을 사용하므로 --zones를 쓸 수 없습니다")
+    return args
 
 if __name__ == "__main__":
+    args = parse_args()
+    log_level = args.log_level.upper()
+    log_format = args.log_format
+    log_listener = setup_logging(log_level, log_format, rate_per_s=log_rate_per_s)
+    source_spec = int(args.source) if args.source.isdigit() else args.source
+    replay_realtime = args.realtime
+    replay_output = args.replay_out
+    zones_path = args.zones or zones_path
+    if args.cameras:
+        camera_sources = [spec.strip() for spec in args.cameras.split(",") if spec.strip()]
+    inference_workers = args.workers
+    latency_budget_ms = args.latency_budget_ms
+    benchmark_path = args.bench
+    if len(camera_sources) > 1:
+        detection_target, detection_args = multi_camera_detection, (camera_sources,)
+    elif inference_workers:
+        detection_target, detection_args = pipeline_detection, (inference_workers,)
+    else:
+        detection_target, detection_args = object_detection, ()
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = MetricsServer(stage_metrics, args.metrics_host, args.metrics_port).start()
     try:
-        threading.Thread(target=object_detection, daemon=True).start()
-        print("🔄 서버에 연결 중...")
-        sio.connect("http://118.218.212.147:59726")
-        sio.emit("connectionForAlarm", cid)
-        sio.wait()
+        if args.offline:
+            log.info("🎞️ 오프라인 모드: 서버 연결 없이 탐지 실행")
+            detection_target(*detection_args)
+        else:
+            threading.Thread(target=detection_target, args=detection_args, daemon=True).start()
+            log.info("🔄 서버에 연결 중...")
+            sio.connect("http://118.218.212.147:59726")
+            sio.emit("connectionForAlarm", cid)
+            if metrics_emit_interval_s > 0:
+                threading.Thread(target=send_metrics, daemon=True).start()
+            sio.wait()
     except KeyboardInterrupt:
-        print("⚠️ 키보드 인터럽트에 의한 종료")
+        log.warning("⚠️ 키보드 인터럽트에 의한 종료")
     except socketio.exceptions.ConnectionError as e:
-        print(f"❌ Socket.IO 연결 에러: {e}")
+        log.error(f"❌ Socket.IO 연결 에러: {e}")
     except Exception as e:
-        print(f"⚠️ 프로그램 오류: {e}")
+        log.warning(f"⚠️ 프로그램 오류: {e}")
     finally:
         running = False
         for room_id in list(room_states.keys()):
             room_states[room_id]["send_frames_enabled"] = False
+        stream_encoder.stop()
+        traffic_reporter.stop()
         if sio.connected:
             try:
                 sio.disconnect()
             except Exception as e:
-                print(f"❌ Socket.IO 연결 해제 에러: {e}")
+                log.error(f"❌ Socket.IO 연결 해제 에러: {e}")
         cleanup_camera()
-        try:
-            pygame.mixer.quit()
-            print("🎵 pygame.mixer 종료")
-        except Exception as e:
-            print(f"❌ pygame.mixer 종료 에러: {e}")
-        print("👋 프로그램 종료")
\ No newline at end of file
+        if alert_scheduler.played:
+            log.info("🔔 음성 안내 통계: %s", alert_scheduler.stats())
+        audio_cues.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        log.info("👋 프로그램 종료")
+        log_listener.stop()
\ No newline at end of file
@@ -9,6 +9,7 @@ import json
 import requests
 from datetime import datetime, timedelta
 import pygame
+from frameScheduler import AdaptiveFrameSkip
 
 # Socket.IO 클라이언트 인스턴스 생성
 sio = socketio.Client()
@@ -32,6 +33,7 @@ target_classes = ['guideDog', 'dog', 'fallen', 'whiteCane', 'carAccident', 'pers
 min_detections = 2
 population_window = timedelta(seconds=120)
 active_person_ids = {}
+target_latency_ms = 200  # 프레임 스킵 조절 목표 지연 시간
 is_setTime_running = False  # setTime 실행 상태를 추적
 
 # pygame 초기화
@@ -138,7 +140,7 @@ def object_detection():
             running = False
             return
 
-        frame_count = 0
+        frame_skip = AdaptiveFrameSkip(target_latency_ms=target_latency_ms)
         print("🔍 객체 탐지 시작...")
 
         while running:
@@ -147,8 +149,7 @@ def object_detection():
                 print("❌ 웹캠에서 프레임을 읽을 수 없습니다.")
                 break
 
-            frame_count += 1
-            if frame_count % 2 != 0:
+            if not frame_skip.should_process():  # 추론 지연 시간 기반 프레임 스킵
                 continue
 
             try:
@@ -178,6 +179,7 @@ def object_detection():
                         current_objects.add((class_name, obj_id))
             print("======================")
 
+            frame_skip.update(results[0].speed, tracking=bool(current_objects))
             manage_population(current_objects, current_datetime)
 
             for class_name, obj_id in current_objects:
@@ -0,0 +1,252 @@
+import logging
+import threading
+import time
+
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class FrameRef:
+    """링 버퍼 슬롯에 대한 참조 (release() 전까지 덮어쓰지 않음)"""
+
+    __slots__ = ("ring", "index", "seq", "timestamp", "frame")
+
+    def __init__(self, ring, index, seq, timestamp, frame):
+        self.ring = ring
+        self.index = index
+        self.seq = seq
+        self.timestamp = timestamp
+        self.frame = frame
+
+    def release(self):
+        if self.ring is not None:
+            self.ring._release(self.index)
+            self.ring = None
+
+
+class FrameRing:
+    """사전 할당된 NumPy 버퍼로 구성된 고정 크기 최신 프레임 링 버퍼"""
+
+    def __init__(self, slots=4):
+        if slots < 3:
+            raise ValueError("slots는 3 이상이어야 합니다 (쓰기/최신/읽기 중)")
+        self.slots = slots
+        self._buffers = None
+        self._views = None
+        self._seq = [0] * slots
+        self._timestamps = [0.0] * slots
+        self._refs = [0] * slots
+        self._latest = -1
+        self._latest_seq = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def allocate(self, shape, dtype=np.uint8):
+        """첫 프레임 크기에 맞춰 버퍼를 한 번만 할당"""
+        with self._cond:
+            self._buffers = [np.empty(shape, dtype=dtype) for _ in range(self.slots)]
+            # 읽기 측에는 쓰기 불가 뷰를 넘겨 실수로 버퍼를 수정하지 않도록 함
+            self._views = []
+            for buf in self._buffers:
+                view = buf.view()
+                view.flags.writeable = False
+                self._views.append(view)
+
+    @property
+    def allocated(self):
+        return self._buffers is not None
+
+    def acquire_write(self):
+        """쓰기 가능한 슬롯 인덱스 반환 (최신 슬롯/읽기 중 슬롯 제외), 없으면 -1"""
+        with self._cond:
+            for offset in range(1, self.slots + 1):
+                index = (self._latest + offset) % self.slots
+                if index != self._latest and self._refs[index] == 0:
+                    self._refs[index] = 1
+                    return index
+            return -1
+
+    def buffer(self, index):
+        return self._buffers[index]
+
+    def commit(self, index, timestamp=None):
+        """쓰기 완료된 슬롯을 최신 프레임으로 공개"""
+        with self._cond:
+            self._refs[index] = 0
+            self._latest_seq += 1
+            self._seq[index] = self._latest_seq
+            self._timestamps[index] = time.time() if timestamp is None else timestamp
+            self._latest = index
+            self._cond.notify_all()
+
+    def abort(self, index):
+        with self._cond:
+            self._refs[index] = 0
+
+    def latest(self, after_seq=0, timeout=None):
+        """after_seq 보다 새로운 최신 프레임 참조 반환 (없으면 대기, 타임아웃/종료 시 None)"""
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._closed or self._latest_seq > after_seq, timeout
+            ):
+                return None
+            if self._latest < 0 or self._latest_seq <= after_seq:
+                return None
+            index = self._latest
+            self._refs[index] += 1
+            return FrameRef(self, index, self._seq[index], self._timestamps[index], self._views[index])
+
+    @property
+    def latest_seq(self):
+        return self._latest_seq
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _release(self, index):
+        with self._cond:
+            if self._refs[index] > 0:
+                self._refs[index] -= 1
+
+
+class FrameSlot:
+    """최신 프레임 하나를 버전 번호와 함께 공유 (복사 없이 참조 카운트로 수명 관리)
+
+    공개하는 항목은 retain()/release()를 제공해야 함 (예: detections.AnnotatedFrame)
+    """
+
+    def __init__(self):
+        self._item = None
+        self._version = 0
+        self._cond = threading.Condition()
+
+    @property
+    def version(self):
+        return self._version
+
+    def publish(self, item):
+        """item의 참조 하나를 넘겨받아 새 버전으로 공개하고 이전 항목의 참조는 반납"""
+        with self._cond:
+            old = self._item
+            self._item = item
+            self._version += 1
+            self._cond.notify_all()
+        if old is not None:
+            old.release()
+
+    def wait(self, after_version=0, timeout=None):
+        """after_version 보다 새 버전이 공개될 때까지 대기해 (version, item) 반환 (타임아웃 시 None)
+
+        반환된 item은 참조가 하나 늘어난 상태이므로 사용 후 반드시 release() 호출
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._item is not None and self._version > after_version, timeout
+            ):
+                return None
+            return self._version, self._item.retain()
+
+    def clear(self):
+        """보관 중인 항목의 참조 반납 (버전은 유지)"""
+        with self._cond:
+            old = self._item
+            self._item = None
+        if old is not None:
+            old.release()
+
+
+class CaptureThread:
+    """카메라 디코딩을 전용 스레드로 분리해 링 버퍼에 최신 프레임을 기록"""
+
+    def __init__(self, cap, slots=4):
+        self.cap = cap
+        self.ring = FrameRing(slots)
+        self.failed = False
+        self.eof = False
+        self.dropped = 0
+        self.on_frame = None  # 새 프레임이 공개될 때마다 호출 (예: 여러 카메라 배치 대기 깨우기)
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self.ring.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def latest(self, after_seq=0, timeout=1.0):
+        return self.ring.latest(after_seq, timeout)
+
+    def _run(self):
+        try:
+            while self._running:
+                if not self.ring.allocated:
+                    ret, frame = self.cap.read()
+                    if not ret:
+                        self.failed = True
+                        break
+                    self.ring.allocate(frame.shape, frame.dtype)
+                    index = self.ring.acquire_write()
+                    np.copyto(self.ring.buffer(index), frame)
+                    self._commit(index)
+                    continue
+
+                index = self.ring.acquire_write()
+                if index < 0:
+                    # 모든 슬롯이 사용 중이면 디코딩 없이 큐만 비움
+                    if not self.cap.grab():
+                        self.failed = True
+                        break
+                    self.dropped += 1
+                    continue
+
+                buf = self.ring.buffer(index)
+                ret, frame = self.cap.read(buf)
+                if not ret:
+                    self.ring.abort(index)
+                    self.failed = True
+                    break
+                if frame is not buf:
+                    # 해상도가 바뀐 경우 등 버퍼 재사용이 불가능하면 복사
+                    if frame.shape != buf.shape:
+                        self.ring.abort(index)
+                        self.failed = True
+                        log.error("❌ 프레임 크기 변경 감지: %s -> %s", buf.shape, frame.shape)
+                        break
+                    np.copyto(buf, frame)
+                self._commit(index)
+        except Exception as e:
+            self.failed = True
+            log.error("❌ 캡처 스레드 에러: %s", e)
+        finally:
+            # 파일 재생 소스라면 읽기 실패는 재생 종료를 의미
+            self.eof = self.failed and not getattr(self.cap, "live", True)
+            self.ring.close()
+            if self.on_frame is not None:
+                self.on_frame()
+
+    def _commit(self, index):
+        self.ring.commit(index)
+        on_frame = self.on_frame
+        if on_frame is not None:
+            on_frame()
+
+
+def open_camera(index=0, width=1280, height=640):
+    """카메라를 열고 드라이버 큐를 최소화"""
+    cap = cv2.VideoCapture(index)
+    if cap.isOpened():
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
@@ -0,0 +1,106 @@
+import math
+import time
+
+
+class AdaptiveFrameSkip:
+    """측정된 추론 시간(results[0].speed)으로 프레임 스킵 간격을 조절
+
+    순차 캡처(should_process)는 밀린 프레임이 지연 시간이 되므로 target_latency_ms 기준으로 조절하고,
+    최신 프레임 링 버퍼(cpu_budget 지정)는 지연 시간이 스킵과 무관하게 처리 시간 정도이므로
+    처리 시간이 (스킵 + 1) 프레임 간격의 cpu_budget 비율 안에 들도록 조절 (남는 CPU는 스트리밍 등에 양보)
+    """
+
+    STAGES = ("preprocess", "inference", "postprocess")
+
+    def __init__(self, target_latency_ms=200.0, max_skip=5, idle_skip=0,
+                 alpha=0.2, hysteresis=0.15, cooldown=5, cpu_budget=None):
+        self.target_latency_ms = target_latency_ms
+        self.cpu_budget = cpu_budget
+        self.max_skip = max_skip
+        self.idle_skip = idle_skip
+        self.alpha = alpha
+        self.hysteresis = hysteresis
+        self.cooldown = cooldown
+        self.skip = 0
+        self.latency_ms = None
+        self.process_ms = None
+        self.frame_interval_ms = None
+        self._since_adjust = 0
+        self._since_processed = 0
+        self._last_frame_time = None
+        self._last_seq = None
+        self._last_captured_at = None
+
+    def _ema(self, prev, value):
+        return value if prev is None else prev + self.alpha * (value - prev)
+
+    def should_process(self):
+        """순차 캡처 루프용: 이번 프레임을 추론할지 여부 (읽은 프레임마다 호출)"""
+        now = time.time()
+        if self._last_frame_time is not None:
+            self.frame_interval_ms = self._ema(self.frame_interval_ms, (now - self._last_frame_time) * 1000)
+        self._last_frame_time = now
+
+        if self._since_processed < self.skip:
+            self._since_processed += 1
+            return False
+        self._since_processed = 0
+        return True
+
+    def update(self, speed, captured_at=None, tracking=True, seq=None):
+        """추론 결과의 단계별 시간(ms)을 반영해 다음 스킵 수를 결정
+
+        seq: 링 버퍼 프레임 번호 (캡처 시각과 함께 카메라 프레임 간격 추정에 사용)
+        """
+        process_ms = sum(speed.get(stage) or 0.0 for stage in self.STAGES)
+        if seq is not None and captured_at is not None:
+            if self._last_seq is not None and seq > self._last_seq:
+                interval_ms = (captured_at - self._last_captured_at) * 1000 / (seq - self._last_seq)
+                self.frame_interval_ms = self._ema(self.frame_interval_ms, interval_ms)
+            self._last_seq = seq
+            self._last_captured_at = captured_at
+        self.process_ms = self._ema(self.process_ms, process_ms)
+        if captured_at is not None:
+            latency_ms = (time.time() - captured_at) * 1000
+        else:
+            latency_ms = process_ms
+        self.latency_ms = self._ema(self.latency_ms, latency_ms)
+
+        # 추적 중인 대상이 없으면 새 객체를 놓치지 않도록 최대 속도로 복귀
+        if not tracking:
+            self.skip = self.idle_skip
+            self._since_adjust = 0
+            return self.skip
+
+        self._since_adjust += 1
+        if self._since_adjust < self.cooldown:
+            return self.skip
+        self._since_adjust = 0
+
+        if self.cpu_budget is not None:
+            return self._budget_skip()
+
+        upper = self.target_latency_ms * (1 + self.hysteresis)
+        lower = self.target_latency_ms * (1 - self.hysteresis)
+        if self.latency_ms > upper:
+            needed = self.skip + 1
+            # 순차 캡처에서는 처리 시간이 프레임 간격 몇 개분인지로 한 번에 맞춤
+            if self.frame_interval_ms:
+                needed = max(needed, math.ceil(self.process_ms / self.frame_interval_ms) - 1)
+            self.skip = min(self.max_skip, needed)
+        elif self.latency_ms < lower and self.skip > 0:
+            self.skip -= 1
+        return self.skip
+
+    def _budget_skip(self):
+        """처리 시간이 (스킵 + 1) 프레임 간격의 cpu_budget 비율 안에 드는 가장 작은 스킵으로 조절"""
+        if not self.frame_interval_ms:
+            return self.skip
+        budget_ms = self.cpu_budget * self.frame_interval_ms
+        needed = min(self.max_skip, max(0, math.ceil(self.process_ms / budget_ms) - 1))
+        if needed > self.skip:
+            self.skip = needed
+        elif needed < self.skip and self.process_ms < budget_ms * self.skip * (1 - self.hysteresis):
+            # 한 단계 줄여도 여유가 있을 때만 낮춤 (경계에서 오르내리지 않도록)
+            self.skip -= 1
+        return self.skip
@@ -0,0 +1,131 @@
+import os
+import time
+
+import cv2
+
+from frameRing import CaptureThread, FrameRef, open_camera
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class VideoFileSource:
+    """녹화된 영상 파일을 카메라처럼 읽는 프레임 소스"""
+
+    live = False
+
+    def __init__(self, path, realtime=False):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.realtime = realtime
+        self._next_time = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _pace(self):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next_time is None:
+            self._next_time = now
+        elif self._next_time > now:
+            time.sleep(self._next_time - now)
+        self._next_time += 1.0 / self.fps
+
+    def read(self, image=None):
+        self._pace()
+        return self.cap.read(image) if image is not None else self.cap.read()
+
+    def grab(self):
+        self._pace()
+        return self.cap.grab()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource:
+    """디렉터리의 JPEG/PNG 파일을 이름순으로 재생하는 프레임 소스"""
+
+    live = False
+
+    def __init__(self, path, fps=10.0, realtime=False):
+        self.path = path
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.fps = fps
+        self.realtime = realtime
+        self.index = 0
+        self._next_time = None
+
+    def isOpened(self):
+        return len(self.files) > 0
+
+    _pace = VideoFileSource._pace
+
+    def read(self, image=None):
+        self._pace()
+        if self.index >= len(self.files):
+            return False, None
+        frame = cv2.imread(self.files[self.index])
+        self.index += 1
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.shape:
+            image[...] = frame
+            return True, image
+        return True, frame
+
+    def grab(self):
+        self._pace()
+        self.index += 1
+        return self.index <= len(self.files)
+
+    def release(self):
+        self.index = len(self.files)
+
+
+class SequentialCapture:
+    """재생용: 프레임을 버리지 않고 순서대로 하나씩 넘김 (CaptureThread와 같은 latest() 형태)"""
+
+    def __init__(self, source):
+        self.source = source
+        self.failed = False
+        self.eof = False
+        self.seq = 0
+
+    def start(self):
+        return self
+
+    def latest(self, after_seq=0, timeout=None):
+        if self.failed:
+            return None
+        ret, frame = self.source.read()
+        if not ret:
+            self.failed = True
+            self.eof = True
+            return None
+        self.seq += 1
+        return FrameRef(None, -1, self.seq, time.time(), frame)
+
+    def stop(self):
+        self.failed = True
+
+
+def open_source(spec=0, width=1280, height=640, realtime=False, fps=10.0):
+    """카메라 번호 / 영상 파일 / 이미지 디렉터리 중 하나를 여는 함수"""
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return open_camera(int(spec), width, height)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, fps=fps, realtime=realtime)
+    return VideoFileSource(spec, realtime=realtime)
+
+
+def start_capture(source, slots=4):
+    """라이브/실시간 재생은 최신 프레임 링 버퍼로, 최고 속도 재생은 순차 읽기로 시작"""
+    if getattr(source, "live", True) or getattr(source, "realtime", False):
+        return CaptureThread(source, slots).start()
+    return SequentialCapture(source).start()
@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from modelRegistry import discover
+
+log = logging.getLogger(__name__)
+
+
+def parse_clock(text):
+    """"HH:MM" -> 자정 이후 분"""
+    hour, minute = text.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+class InputSizeSelector:
+    """장치별 벤치마크 결과(benchModels.py --json)로 지연 시간 예산 안에서 가장 큰 입력 크기의 모델 선택
+
+    같은 체크포인트를 여러 입력 크기로 내보낸 모델(capstone3.2_320x160, capstone3.2_640x320 ...) 중에서
+    카메라 프레임에 실제로 적용되는 배율(레터박스 후 해상도)이 가장 큰 모델을 고르고,
+    배율이 같으면 더 빠른 모델을 고름 (2:1 카메라에는 640x320이 640x640과 배율이 같고 두 배 빠름)
+
+    schedule: [("07:00", "09:30", 예산 ms), ...] 시간대별 예산 (자정을 넘는 구간 가능), 나머지는 budget_ms
+    """
+
+    def __init__(self, rows, family, budget_ms, schedule=(), frame_size=(640, 1280), metric="p95_ms",
+                 available=None):
+        self.family = family
+        self.budget_ms = budget_ms
+        self.schedule = [(parse_clock(start), parse_clock(end), budget) for start, end, budget in schedule]
+        self.frame_size = frame_size  # 카메라 프레임 (h, w)
+        self.metric = metric
+        self.rows = [
+            row for row in rows
+            if self._in_family(row["model"]) and (available is None or row["model"] in available)
+        ]
+
+    @classmethod
+    def load(cls, path, family, budget_ms, schedule=(), frame_size=(640, 1280), metric="p95_ms"):
+        """벤치마크 JSON을 읽어 생성 (파일이 없거나 이 계열 모델 측정값이 없으면 None: model_name 그대로 사용)"""
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f).get("results", [])
+        available = {name for name, info in discover().items() if info.has_weights}
+        selector = cls(rows, family, budget_ms, schedule, frame_size, metric, available)
+        return selector if selector.rows else None
+
+    def _in_family(self, name):
+        return name == self.family or name.startswith(self.family + "_")
+
+    def scale(self, row):
+        """카메라 프레임을 이 입력 크기로 레터박스할 때의 배율"""
+        in_h, in_w = row["imgsz"]
+        h, w = self.frame_size
+        return min(in_h / h, in_w / w)
+
+    def budget_at(self, when=None):
+        when = when or datetime.now()
+        minute = when.hour * 60 + when.minute
+        for start, end, budget in self.schedule:
+            if (start <= minute < end) if start <= end else (minute >= start or minute < end):
+                return budget
+        return self.budget_ms
+
+    def choose(self, budget_ms):
+        """예산 안에 드는 모델 중 배율이 가장 큰(같으면 더 빠른) 모델, 없으면 가장 빠른 모델"""
+        fits = [row for row in self.rows if row[self.metric] <= budget_ms]
+        if not fits:
+            return min(self.rows, key=lambda row: row[self.metric])
+        return max(fits, key=lambda row: (self.scale(row), -row[self.metric]))
+
+    def select(self, when=None):
+        """(모델 이름, 적용한 예산 ms, 벤치마크 행)"""
+        budget = self.budget_at(when)
+        row = self.choose(budget)
+        return row["model"], budget, row
+
+
+class ModelSwitcher:
+    """시간대별 예산으로 고른 모델이 바뀌면 새 모델을 백그라운드 스레드에서 로드해 두었다가 넘겨줌
+
+    탐지 루프는 poll()만 호출하므로 모델 로드(수 초) 동안에도 멈추지 않음
+    """
+
+    def __init__(self, selector, loader, current, interval_s=60.0):
+        self.selector = selector
+        self.loader = loader  # 모델 이름 -> 로드된 모델
+        self.current = current
+        self.interval_s = interval_s
+        self._next_check = time.monotonic() + interval_s
+        self._loading = None
+        self._ready = None
+
+    def poll(self):
+        """새 모델이 준비됐으면 (이름, 모델, 예산 ms, 벤치마크 행) 반환, 아니면 None"""
+        ready = self._ready
+        if ready is not None:
+            self._ready = None
+            self._loading = None
+            self.current = ready[0]
+            return ready
+        now = time.monotonic()
+        if self._loading is not None or now < self._next_check:
+            return None
+        self._next_check = now + self.interval_s
+        name, budget, row = self.selector.select()
+        if name != self.current:
+            self._loading = name
+            threading.Thread(target=self._load, args=(name, budget, row), name="model-switch", daemon=True).start()
+        return None
+
+    def _load(self, name, budget, row):
+        try:
+            self._ready = (name, self.loader(name), budget, row)
+        except Exception as e:
+            log.error("❌ 모델 전환 로드 에러 (%s): %s", name, e)
+            self._loading = None
@@ -0,0 +1,117 @@
+import importlib
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+PROCESS_START = time.perf_counter()
+import_times = {}  # 모듈 이름 -> 실제 import에 걸린 시간 (초)
+_import_lock = threading.Lock()
+
+
+class LazyModule:
+    """첫 속성 접근 시점까지 무거운 모듈 import를 미룸"""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    import_times[self._name] = time.perf_counter() - start
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self):
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "deferred"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_module(name):
+    return LazyModule(name)
+
+
+class DeferredClient:
+    """socketio.Client를 처음 사용할 때 생성하고, 미리 등록된 이벤트 핸들러를 적용"""
+
+    def __init__(self, socketio_module, **kwargs):
+        self._socketio = socketio_module
+        self._kwargs = kwargs
+        self._handlers = []
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    client = self._socketio.Client(**self._kwargs)
+                    for event, handler in self._handlers:
+                        client.on(event, handler)
+                    self._client = client
+        return self._client
+
+    def event(self, handler):
+        return self.on(handler.__name__, handler)
+
+    def on(self, event, handler=None):
+        def register(h):
+            if self._client is not None:
+                self._client.on(event, h)
+            else:
+                self._handlers.append((event, h))
+            return h
+        return register if handler is None else register(handler)
+
+    @property
+    def connected(self):
+        return self._client is not None and self._client.connected
+
+    def __getattr__(self, attr):
+        return getattr(self.client, attr)
+
+
+class StartupTimer:
+    """부팅~첫 탐지까지 단계별 시간과 import 시간을 기록/보고"""
+
+    def __init__(self, target_s=None):
+        self.target_s = target_s
+        self.marks = {}
+        self.reported = False
+
+    def mark(self, name):
+        """단계 완료 시점 기록 (같은 이름은 처음 한 번만)"""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - PROCESS_START
+        return self.marks[name]
+
+    def report(self):
+        self.reported = True
+        lines = [f"   {name}: {elapsed:.2f}초" for name, elapsed in self.marks.items()]
+        lines += [f"   import {name}: {elapsed:.2f}초"
+                  for name, elapsed in sorted(import_times.items(), key=lambda item: -item[1])]
+        log.info("⏱️ 시작 시간 보고\n%s", "\n".join(lines))
+        if self.target_s is not None and self.marks:
+            total = max(self.marks.values())
+            if total <= self.target_s:
+                log.info("✅ 부팅~첫 탐지 %.2f초 (목표 %.1f초)", total, self.target_s)
+            else:
+                log.warning("⚠️ 부팅~첫 탐지 %.2f초 (목표 %.1f초)", total, self.target_s)
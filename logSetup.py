@@ -0,0 +1,100 @@
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class RateLimitFilter(logging.Filter):
+    """메시지 키별 토큰 버킷으로 출력 빈도 제한 (WARNING 이상은 제한하지 않음)
+
+    키는 extra={"log_key": ...}로 지정하고, 없으면 포맷 전 메시지 템플릿을 사용
+    limits: 키 -> (초당 허용 수, 버스트) / 초당 허용 수가 None이면 제한 없음
+    max_keys: 버킷 최대 개수, 넘으면 가장 오래 쓰이지 않은 키부터 버림 (키가 계속 늘어나도 메모리 고정)
+    """
+
+    def __init__(self, rate_per_s=1.0, burst=5, min_level=logging.WARNING, limits=None, max_keys=1024):
+        super().__init__()
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self.min_level = min_level
+        self.limits = dict(limits or {})
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # 키 -> [남은 토큰, 마지막 갱신 시각, 생략된 수]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= self.min_level:
+            return True
+        key = getattr(record, "log_key", None) or record.msg
+        rate_per_s, burst = self.limits.get(key, (self.rate_per_s, self.burst))
+        if rate_per_s is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now, 0]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate_per_s)
+                bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} (같은 종류 {suppressed}건 생략)"
+            record.args = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """journald/수집기용 한 줄 JSON 형식"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        key = getattr(record, "log_key", None)
+        if key is not None:
+            entry["key"] = key
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(level=logging.INFO, fmt="text", rate_per_s=1.0, burst=5, limits=None, stream=None):
+    """루트 로거를 비동기 큐 핸들러로 설정하고 출력 스레드(QueueListener) 반환
+
+    로그를 남기는 스레드는 큐에 넣기만 하고, 실제 stdout 쓰기는 출력 스레드가 담당
+    """
+    log_queue = queue.SimpleQueue()  # 크기 제한 없음: put()이 절대 막히지 않음
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(rate_per_s, burst, limits=limits))
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname).1s [%(threadName)s] %(message)s"))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -1,10 +1,9 @@
 import numpy as np
 import ncnn
-import torch
 
 def test_inference():
-    torch.manual_seed(0)
-    in0 = torch.rand(1, 3, 640, 640, dtype=torch.float)
+    rng = np.random.default_rng(0)
+    in0 = rng.random((3, 640, 640), dtype=np.float32)
     out = []
 
     with ncnn.Net() as net:
@@ -12,10 +11,10 @@ def test_inference():
         net.load_model("model/capstone2.8_ncnn_model/model.ncnn.bin")
 
         with net.create_extractor() as ex:
-            ex.input("in0", ncnn.Mat(in0.squeeze(0).numpy()).clone())
+            ex.input("in0", ncnn.Mat(in0).clone())
 
             _, out0 = ex.extract("out0")
-            out.append(torch.from_numpy(np.array(out0)).unsqueeze(0))
+            out.append(np.expand_dims(np.array(out0), 0))
 
     if len(out) == 1:
         return out[0]
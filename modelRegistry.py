@@ -0,0 +1,107 @@
+import os
+
+import yaml
+
+MODEL_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model")
+MODEL_SUFFIX = "_ncnn_model"
+DEFAULT_MODEL = "capstone2.5"
+# convertModelForm.py --multi-res 로 내보내는 입력 크기 (가로x세로): 모두 카메라 1280x640과 같은 2:1 비율이라
+# 레터박스 패딩이 없고, 가로/세로 모두 stride(32)의 배수 (416x208은 208이 배수가 아니라 448x224 사용)
+MULTI_RES_SIZES = ("320x160", "384x192", "448x224", "512x256", "640x320")
+
+
+class ModelInfo:
+    """내보낸 NCNN 모델 디렉터리 하나의 metadata.yaml 정보"""
+
+    def __init__(self, name, path, metadata):
+        self.name = name
+        self.path = path
+        self.metadata = metadata
+        self.names = {int(k): v for k, v in metadata.get("names", {}).items()}
+        imgsz = metadata.get("imgsz", [640, 640])
+        self.imgsz = (int(imgsz[0]), int(imgsz[1]))  # (h, w)
+        self.stride = int(metadata.get("stride", 32))
+        self.batch = int(metadata.get("batch", 1))
+        self.date = metadata.get("date")
+        self.version = metadata.get("version")
+        self.task = metadata.get("task", "detect")
+        args = metadata.get("args") or {}
+        self.half = bool(args.get("half", False))
+        self.int8 = bool(args.get("int8", False))
+
+    @property
+    def param_path(self):
+        return os.path.join(self.path, "model.ncnn.param")
+
+    @property
+    def bin_path(self):
+        return os.path.join(self.path, "model.ncnn.bin")
+
+    @property
+    def has_weights(self):
+        return os.path.exists(self.param_path) and os.path.exists(self.bin_path)
+
+    def class_id(self, class_name):
+        for class_id, name in self.names.items():
+            if name == class_name:
+                return class_id
+        return None
+
+    def __repr__(self):
+        return f"<ModelInfo {self.name} imgsz={self.imgsz} classes={len(self.names)} date={self.date}>"
+
+
+def parse_imgsz(text):
+    """입력 크기 문자열을 (h, w)로 변환: "640" -> (640, 640), 카메라처럼 가로x세로인 "640x320" -> (320, 640)"""
+    text = str(text).lower()
+    if "x" in text:
+        w, h = text.split("x", 1)
+        return int(h), int(w)
+    return int(text), int(text)
+
+
+def sized_name(base, imgsz):
+    """입력 크기별로 내보낸 모델 이름 (capstone3.2_320x160, 정사각형은 capstone3.2_640)"""
+    h, w = imgsz
+    return f"{base}_{w}" if h == w else f"{base}_{w}x{h}"
+
+
+def discover(root=MODEL_ROOT):
+    """root 아래 *_ncnn_model 디렉터리를 찾아 {이름: ModelInfo} 반환 (날짜순)"""
+    models = {}
+    if not os.path.isdir(root):
+        return models
+    for entry in sorted(os.listdir(root)):
+        path = os.path.join(root, entry)
+        metadata_path = os.path.join(path, "metadata.yaml")
+        if not entry.endswith(MODEL_SUFFIX) or not os.path.isfile(metadata_path):
+            continue
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = yaml.safe_load(f) or {}
+        name = entry[:-len(MODEL_SUFFIX)]
+        models[name] = ModelInfo(name, path, metadata)
+    return dict(sorted(models.items(), key=lambda item: str(item[1].date)))
+
+
+def get_model(name=DEFAULT_MODEL, root=MODEL_ROOT):
+    """모델 이름(capstone2.5) 또는 디렉터리 경로로 ModelInfo 조회"""
+    if os.path.isdir(name) and os.path.isfile(os.path.join(name, "metadata.yaml")):
+        with open(os.path.join(name, "metadata.yaml"), "r", encoding="utf-8") as f:
+            metadata = yaml.safe_load(f) or {}
+        base = os.path.basename(os.path.normpath(name))
+        if base.endswith(MODEL_SUFFIX):
+            base = base[:-len(MODEL_SUFFIX)]
+        return ModelInfo(base, name, metadata)
+
+    models = discover(root)
+    if name not in models:
+        raise KeyError(f"등록되지 않은 모델: {name} (사용 가능: {', '.join(models)})")
+    return models[name]
+
+
+if __name__ == "__main__":
+    for info in discover().values():
+        weights = "✅" if info.has_weights else "❌ bin 없음"
+        names = ", ".join(info.names.values())
+        print(f"{info.name:12s} imgsz={info.imgsz} stride={info.stride} date={info.date} {weights}")
+        print(f"{'':12s} classes: {names}")
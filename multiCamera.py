@@ -0,0 +1,118 @@
+import threading
+
+from crosswalkZones import CrosswalkZones
+from frameSource import open_source, start_capture
+from ncnnDetector import IouTracker
+from trackStore import TrackStore
+
+# 카메라마다 track id 범위를 나눠 인구 집계/로그에서 id가 겹치지 않도록 함
+CAMERA_ID_STRIDE = 1_000_000
+
+
+class CameraStream:
+    """멀티 카메라 모드의 카메라 하나 (캡처, 추적기, 체류 상태, 관심 영역을 각자 보유)"""
+
+    def __init__(self, index, spec, width=1280, height=640, realtime=False, zones_path=None):
+        self.index = index
+        self.spec = spec
+        self.name = f"cam{index}"
+        self.source = open_source(spec, width, height, realtime=realtime)
+        self.capture = None
+        self.tracker = IouTracker(first_id=index * CAMERA_ID_STRIDE + 1)
+        self.states = TrackStore()
+        self.zones_path = zones_path
+        self.zones = None
+        self.last_seq = 0
+        self.done = False
+
+    def start(self, names, on_frame=None, slots=5):
+        self.zones = CrosswalkZones.load(self.zones_path, names)
+        self.capture = start_capture(self.source, slots=slots)
+        if hasattr(self.capture, "on_frame"):
+            self.capture.on_frame = on_frame
+        return self
+
+    def ready(self):
+        """아직 처리하지 않은 새 프레임이 있는지 (순차 재생 소스는 항상 다음 프레임이 있음)"""
+        if self.done:
+            return False
+        ring = getattr(self.capture, "ring", None)
+        if ring is None:
+            return not self.capture.failed
+        if ring.latest_seq > self.last_seq:
+            return True
+        if self.capture.failed:
+            self.done = True
+        return False
+
+    def take(self):
+        """새 프레임 참조 (사용 후 release() 필요), 끝났으면 None"""
+        frame_ref = self.capture.latest(self.last_seq, timeout=0)
+        if frame_ref is None:
+            if self.capture.failed:
+                self.done = True
+            return None
+        self.last_seq = frame_ref.seq
+        return frame_ref
+
+    def stop(self):
+        if self.capture is not None:
+            self.capture.stop()
+        if self.source.isOpened():
+            self.source.release()
+
+
+class CameraPoller:
+    """여러 카메라 중 새 프레임이 있는 카메라를 골라 줌
+
+    배치 추론이 없으므로(ncnn Mat에는 배치 차원이 없음) 다른 카메라 프레임을 기다리지 않고,
+    준비된 프레임을 바로 돌려줘 카메라마다 도착하는 대로 추론하게 함
+    """
+
+    def __init__(self, cameras):
+        self.cameras = cameras
+        self._cond = threading.Condition()
+
+    def start(self, names):
+        for camera in self.cameras:
+            camera.start(names, on_frame=self.notify)
+        return self
+
+    def notify(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def stop(self):
+        for camera in self.cameras:
+            camera.stop()
+
+    @property
+    def done(self):
+        return all(camera.done for camera in self.cameras)
+
+    def next_frames(self, timeout=1.0):
+        """지금 새 프레임이 있는 카메라들의 [(카메라, FrameRef), ...] (카메라당 최대 한 장)
+
+        하나도 없으면 하나가 준비될 때까지만 대기, 타임아웃 시 빈 목록, 모든 카메라가 끝났으면 None
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: any(camera.ready() for camera in self.cameras) or self.done, timeout)
+            if self.done:
+                return None
+
+        frames = []
+        for camera in self.cameras:
+            if camera.ready():
+                frame_ref = camera.take()
+                if frame_ref is not None:
+                    frames.append((camera, frame_ref))
+        return frames
+
+
+def infer_frame(model, frame, conf=0.25, iou=0.45, imgsz=None):
+    """공유 모델 하나로 카메라 프레임 한 장 추론 (추적 없음, 추적은 카메라별 추적기에서)
+
+    imgsz: 내보낸 입력 크기 (h, w), Ultralytics가 직사각형 입력 모델을 그 크기로 레터박스하도록 전달
+    """
+    kwargs = {"imgsz": imgsz} if imgsz is not None else {}
+    return model.predict(frame, conf=conf, iou=iou, verbose=False, **kwargs)[0]
@@ -0,0 +1,246 @@
+import time
+
+import cv2
+import numpy as np
+
+from detections import draw_detections
+from modelRegistry import get_model
+
+
+def box_iou(a, b):
+    """xyxy 박스 집합 간 IoU 행렬 (len(a) x len(b))"""
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def nms(boxes, scores, iou_threshold, max_det=300):
+    """NumPy 벡터화 NMS (점수 내림차순으로 남은 박스 전체와 한 번에 IoU 계산)"""
+    order = scores.argsort()[::-1]
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    keep = []
+    while order.size > 0 and len(keep) < max_det:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def letterbox(frame, imgsz, canvas=None):
+    """비율을 유지한 채 imgsz (h, w)에 맞추고 남는 곳은 114로 채움, (canvas, scale, pad_x, pad_y) 반환"""
+    in_h, in_w = imgsz
+    h, w = frame.shape[:2]
+    r = min(in_h / h, in_w / w)
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    pad_x = (in_w - new_w) // 2
+    pad_y = (in_h - new_h) // 2
+    if canvas is None:
+        canvas = np.empty((in_h, in_w, 3), dtype=np.uint8)
+    canvas[:] = 114
+    cv2.resize(frame, (new_w, new_h), dst=canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w],
+               interpolation=cv2.INTER_LINEAR)
+    return canvas, r, pad_x, pad_y
+
+
+class IouTracker:
+    """같은 클래스끼리 IoU 그리디 매칭으로 track id를 유지하는 경량 추적기"""
+
+    def __init__(self, iou_threshold=0.3, max_age=15, first_id=1):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.first_id = first_id  # 카메라마다 id 범위를 나눌 때 사용
+        self.reset()
+
+    def reset(self):
+        self.next_id = self.first_id
+        self.boxes = np.empty((0, 4), dtype=np.float32)
+        self.cls = np.empty(0, dtype=np.int64)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.age = np.empty(0, dtype=np.int64)
+
+    def update(self, boxes, cls):
+        """탐지 결과에 track id 배열을 부여하고 추적 상태 갱신"""
+        n = len(boxes)
+        ids = np.zeros(n, dtype=np.int64)
+        matched_tracks = np.zeros(len(self.ids), dtype=bool)
+        matched_dets = np.zeros(n, dtype=bool)
+
+        if n and len(self.ids):
+            iou = box_iou(boxes, self.boxes)
+            iou[cls[:, None] != self.cls[None, :]] = 0
+            # IoU 높은 쌍부터 그리디 매칭
+            det_idx, trk_idx = np.nonzero(iou >= self.iou_threshold)
+            order = np.argsort(-iou[det_idx, trk_idx])
+            for d, t in zip(det_idx[order], trk_idx[order]):
+                if matched_dets[d] or matched_tracks[t]:
+                    continue
+                matched_dets[d] = True
+                matched_tracks[t] = True
+                ids[d] = self.ids[t]
+
+        new = ~matched_dets
+        ids[new] = np.arange(self.next_id, self.next_id + int(new.sum()))
+        self.next_id += int(new.sum())
+
+        # 매칭되지 않은 기존 트랙은 max_age 프레임 동안 유지
+        keep = ~matched_tracks
+        keep[keep] = self.age[keep] + 1 <= self.max_age
+        self.boxes = np.concatenate([boxes.astype(np.float32), self.boxes[keep]])
+        self.cls = np.concatenate([cls, self.cls[keep]])
+        self.ids = np.concatenate([ids, self.ids[keep]])
+        self.age = np.concatenate([np.zeros(n, dtype=np.int64), self.age[keep] + 1])
+        return ids
+
+
+class NcnnBoxes:
+    """Ultralytics Boxes와 같은 속성(cls/id/conf/xyxy)을 NumPy 배열로 제공"""
+
+    def __init__(self, xyxy, conf, cls, ids=None):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+        self.id = ids
+        self.is_track = ids is not None
+
+    def __len__(self):
+        return len(self.cls)
+
+    def __iter__(self):
+        for i in range(len(self.cls)):
+            yield NcnnBoxes(
+                self.xyxy[i:i + 1],
+                self.conf[i:i + 1],
+                self.cls[i:i + 1],
+                self.id[i] if self.id is not None else None,
+            )
+
+
+class NcnnResults:
+    """Ultralytics Results 대체 (names/boxes/speed/plot)"""
+
+    def __init__(self, orig_img, names, boxes, speed):
+        self.orig_img = orig_img
+        self.orig_shape = orig_img.shape[:2]
+        self.names = names
+        self.boxes = boxes
+        self.speed = speed
+
+    def plot(self, img=None):
+        """탐지 결과를 그린 새 이미지 반환 (원본은 수정하지 않음)"""
+        annotated = (self.orig_img if img is None else img).copy()
+        boxes = self.boxes
+        return draw_detections(annotated, boxes.cls, boxes.id, boxes.conf, boxes.xyxy, self.names)
+
+
+class NcnnDetector:
+    """ncnn.Net을 직접 사용하는 YOLO 탐지기 (model.track() 대체, torch 불필요)"""
+
+    def __init__(self, model_dir, num_threads=4, conf=0.25, iou=0.45, max_det=300):
+        import ncnn
+
+        self.info = get_model(model_dir)
+        self.model_dir = self.info.path
+        self.names = self.info.names
+        self.imgsz = self.info.imgsz  # (h, w)
+        self.conf = conf
+        self.iou = iou
+        self.max_det = max_det
+        self.num_threads = num_threads
+
+        self._ncnn = ncnn
+        self.net = ncnn.Net()
+        self.net.opt.use_vulkan_compute = False
+        self.net.opt.num_threads = num_threads
+        param_path = self.info.param_path
+        bin_path = self.info.bin_path
+        if self.net.load_param(param_path) != 0:
+            raise RuntimeError(f"ncnn param 로드 실패: {param_path}")
+        if self.net.load_model(bin_path) != 0:
+            raise RuntimeError(f"ncnn model 로드 실패: {bin_path}")
+
+        # 레터박스 캔버스는 한 번만 할당해 재사용
+        self._canvas = np.full((self.imgsz[0], self.imgsz[1], 3), 114, dtype=np.uint8)
+        self._norm = [1 / 255.0, 1 / 255.0, 1 / 255.0]
+        self.tracker = IouTracker()
+
+    def letterbox(self, frame):
+        """비율을 유지한 채 입력 크기에 맞추고 (scale, pad_x, pad_y) 반환"""
+        return letterbox(frame, self.imgsz, self._canvas)
+
+    def infer(self, canvas):
+        """레터박스된 BGR 이미지로 out0 텐서 (4 + nc, N) 추출"""
+        ncnn = self._ncnn
+        in_h, in_w = self.imgsz
+        mat = ncnn.Mat.from_pixels(canvas, ncnn.Mat.PixelType.PIXEL_BGR2RGB, in_w, in_h)
+        mat.substract_mean_normalize([], self._norm)
+        ex = self.net.create_extractor()
+        ex.input("in0", mat)
+        _, out0 = ex.extract("out0")
+        return np.array(out0)
+
+    def decode(self, out, r, pad_x, pad_y, orig_shape, conf, iou):
+        """out0 (cx, cy, w, h, 클래스 점수...) 를 원본 좌표계 xyxy/conf/cls로 변환"""
+        scores = out[4:]
+        cls = scores.argmax(axis=0)
+        confs = scores[cls, np.arange(scores.shape[1])]
+        mask = confs > conf
+        if not mask.any():
+            return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.int64)
+
+        cx, cy, bw, bh = out[:4, mask]
+        confs = confs[mask]
+        cls = cls[mask]
+        boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+
+        # 클래스별 NMS를 한 번에 처리하기 위해 클래스마다 좌표 오프셋 적용
+        offsets = cls[:, None].astype(np.float32) * 7680
+        keep = nms(boxes + offsets, confs, iou, self.max_det)
+        boxes, confs, cls = boxes[keep], confs[keep], cls[keep]
+
+        boxes[:, [0, 2]] -= pad_x
+        boxes[:, [1, 3]] -= pad_y
+        boxes /= r
+        h, w = orig_shape
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+        return boxes.astype(np.float32), confs.astype(np.float32), cls.astype(np.int64)
+
+    def predict(self, source, conf=None, iou=None, persist=False, tracking=False, **kwargs):
+        """단일 프레임 추론, Ultralytics와 같이 결과 리스트 반환"""
+        conf = self.conf if conf is None else conf
+        iou = self.iou if iou is None else iou
+
+        t0 = time.perf_counter()
+        canvas, r, pad_x, pad_y = self.letterbox(source)
+        t1 = time.perf_counter()
+        out = self.infer(canvas)
+        t2 = time.perf_counter()
+        boxes, confs, cls = self.decode(out, r, pad_x, pad_y, source.shape[:2], conf, iou)
+        ids = None
+        if tracking:
+            if not persist:
+                self.tracker.reset()
+            ids = self.tracker.update(boxes, cls).astype(np.float32)
+        t3 = time.perf_counter()
+
+        speed = {
+            "preprocess": (t1 - t0) * 1000,
+            "inference": (t2 - t1) * 1000,
+            "postprocess": (t3 - t2) * 1000,
+        }
+        return [NcnnResults(source, self.names, NcnnBoxes(boxes, confs, cls, ids), speed)]
+
+    def track(self, source, conf=None, iou=None, persist=True, **kwargs):
+        """model.track()과 같은 호출 형태로 추론 + track id 부여"""
+        return self.predict(source, conf=conf, iou=iou, persist=persist, tracking=True)
+
+    __call__ = predict
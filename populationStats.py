@@ -0,0 +1,67 @@
+import numpy as np
+
+
+class PopulationStats:
+    """초당 인원 수를 고정 크기 순환 배열에 기록하고, 집계 구간마다 점유/체류 시간 통계를 한 번에 계산"""
+
+    def __init__(self, window_s=120, dwell_edges_s=(0, 5, 10, 20, 30, 60, 120, 300), percentiles=(50, 90, 95)):
+        self.window_s = int(window_s)
+        self.dwell_edges_s = np.asarray(dwell_edges_s, dtype=np.float64)
+        self.percentiles = tuple(percentiles)
+        # 초 단위 최대 인원 수 (-1: 해당 초에 처리된 프레임 없음)
+        # 구간 경계의 초가 구간 첫 초를 덮어쓰지 않도록 한 칸 여유
+        self.counts = np.full(self.window_s + 1, -1, dtype=np.int32)
+        # 마지막 칸은 마지막 경계 이상 (예: 300초 이상)
+        self.dwell_counts = np.zeros(len(self.dwell_edges_s), dtype=np.int64)
+        self._second = None
+
+    def observe(self, occupancy, now):
+        """현재 프레임의 인원 수 기록 (같은 초 안에서는 최댓값 유지)"""
+        second = int(now)
+        slot = second % len(self.counts)
+        if second != self._second:
+            self.counts[slot] = occupancy
+            self._second = second
+        elif occupancy > self.counts[slot]:
+            self.counts[slot] = occupancy
+
+    def add_dwell(self, dwell_s):
+        """떠난 사람들의 체류 시간(초)을 히스토그램에 추가"""
+        dwell_s = np.asarray(dwell_s, dtype=np.float64).ravel()
+        if dwell_s.size == 0:
+            return
+        bins = np.searchsorted(self.dwell_edges_s, dwell_s, side="right") - 1
+        np.add.at(self.dwell_counts, np.clip(bins, 0, len(self.dwell_counts) - 1), 1)
+
+    def summary(self):
+        """집계 구간의 점유 통계(최소/최대/평균/백분위)와 체류 시간 히스토그램"""
+        samples = self.counts[self.counts >= 0]
+        occupancy = {"samples": int(samples.size)}
+        if samples.size:
+            occupancy.update({
+                "min": int(samples.min()),
+                "max": int(samples.max()),
+                "mean": round(float(samples.mean()), 2),
+            })
+            values = np.percentile(samples, self.percentiles)
+            for p, value in zip(self.percentiles, values.tolist()):
+                occupancy[f"p{p}"] = round(value, 2)
+        return {
+            "window_s": self.window_s,
+            "occupancy": occupancy,
+            "dwell": {
+                "edges_s": self.dwell_edges_s.tolist(),
+                "counts": self.dwell_counts.tolist(),
+            },
+        }
+
+    def reset(self):
+        self.counts.fill(-1)
+        self.dwell_counts.fill(0)
+        self._second = None
+
+    def flush(self):
+        """통계를 반환하고 다음 집계 구간을 위해 초기화"""
+        stats = self.summary()
+        self.reset()
+        return stats
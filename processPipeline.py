@@ -0,0 +1,378 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from frameRing import FrameRef
+
+log = logging.getLogger(__name__)
+
+
+def default_workers():
+    """추론 워커 수: 코어 하나는 캡처/조정 프로세스 몫으로 남김 (라즈베리파이 4코어 -> 3)"""
+    return max(1, (os.cpu_count() or 4) - 1)
+
+
+def load_detector(backend, path, threads):
+    """워커 프로세스용 탐지 모델 로드 (finalForPi.load_model과 같은 백엔드 선택)"""
+    if backend == "ncnn":
+        from ncnnDetector import NcnnDetector
+        return NcnnDetector(path, num_threads=threads)
+    from ultralytics import YOLO
+    return YOLO(path, task="detect")
+
+
+class SharedFrameRing:
+    """프로세스 간 공유 메모리 프레임 슬롯 (프레임은 복사/피클 없이 슬롯 번호만 주고받음)
+
+    조정 프로세스가 만들고(create) 캡처/워커 프로세스는 이름으로 붙음(attach)
+    빈 슬롯 번호는 free 큐로 돌려받으며, FrameRef.release()가 곧 슬롯 반납
+    """
+
+    def __init__(self, slots, frame_bytes, free, names=None):
+        self.slots = slots
+        self.frame_bytes = frame_bytes
+        self.free = free
+        create = names is None
+        self._blocks = [
+            shared_memory.SharedMemory(name=None if create else names[i], create=create, size=frame_bytes)
+            for i in range(slots)
+        ]
+        self._owner = create
+        if create:
+            for index in range(slots):
+                free.put(index)
+
+    @property
+    def spec(self):
+        """다른 프로세스에서 attach()에 넘길 값"""
+        return self.slots, self.frame_bytes, self.free, [block.name for block in self._blocks]
+
+    @classmethod
+    def attach(cls, spec):
+        slots, frame_bytes, free, names = spec
+        return cls(slots, frame_bytes, free, names)
+
+    def array(self, index, shape, dtype=np.uint8, writeable=True):
+        """슬롯 메모리를 그대로 가리키는 배열 (shape 크기는 frame_bytes 이하)"""
+        view = np.ndarray(shape, dtype=dtype, buffer=self._blocks[index].buf)
+        if not writeable:
+            view.flags.writeable = False
+        return view
+
+    def _release(self, index):
+        self.free.put(index)
+
+    def close(self):
+        for block in self._blocks:
+            try:
+                block.close()
+            except BufferError:
+                # 아직 살아 있는 배열 뷰가 있으면 매핑은 프로세스 종료 시 해제됨
+                pass
+        if self._owner:
+            for block in self._blocks:
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    pass
+        self._blocks = []
+
+
+def _init_process(name, log_level, log_format):
+    """자식 프로세스 공통 초기화: 스레드 이름(로그 표시용)과 로그 출력 스레드"""
+    from logSetup import setup_logging
+    threading.current_thread().name = name
+    return setup_logging(log_level, log_format)
+
+
+def capture_main(spec, width, height, realtime, ring_spec, tasks, results, workers, stop_event,
+                 log_level="INFO", log_format="text"):
+    """캡처 프로세스: 프레임을 공유 메모리 슬롯에 직접 디코딩하고 (순번, 슬롯) 작업을 워커에 배분
+
+    라이브 카메라/실시간 재생은 빈 슬롯이 없으면 디코딩 없이 버리고 (항상 최신 프레임 유지),
+    최고 속도 재생은 빈 슬롯이 생길 때까지 기다려 프레임을 하나도 버리지 않음
+    """
+    from frameSource import open_source
+
+    listener = _init_process("capture", log_level, log_format)
+    ring = SharedFrameRing.attach(ring_spec)
+    source = open_source(spec, width, height, realtime=realtime)
+    sequential = not getattr(source, "live", True) and not realtime
+    seq = 0
+    dropped = 0
+    eof = False
+    shape = None
+    try:
+        if not source.isOpened():
+            log.error(f"❌ 프레임 소스를 열 수 없습니다: {spec}")
+            return
+        while not stop_event.is_set():
+            try:
+                index = ring.free.get(timeout=0.5) if sequential else ring.free.get_nowait()
+            except queue.Empty:
+                if sequential:
+                    continue
+                # 모든 슬롯이 처리 중: 드라이버 큐만 비우고 이 프레임은 버림
+                if not source.grab():
+                    eof = not getattr(source, "live", True)
+                    break
+                dropped += 1
+                time.sleep(0.001)
+                continue
+
+            if shape is None:
+                ret, frame = source.read()
+                if ret and frame.nbytes > ring.frame_bytes:
+                    log.error(f"❌ 프레임이 공유 메모리 슬롯보다 큽니다: {frame.shape} ({ring.frame_bytes} bytes)")
+                    ring.free.put(index)
+                    break
+                if ret:
+                    shape = frame.shape
+                    np.copyto(ring.array(index, shape), frame)
+            else:
+                buf = ring.array(index, shape)
+                ret, frame = source.read(buf)
+                if ret and frame is not buf:
+                    if frame.shape != shape:
+                        log.error(f"❌ 프레임 크기 변경 감지: {shape} -> {frame.shape}")
+                        ring.free.put(index)
+                        break
+                    np.copyto(buf, frame)
+                del buf
+            if not ret:
+                ring.free.put(index)
+                # 파일 재생 소스라면 읽기 실패는 재생 종료를 의미
+                eof = not getattr(source, "live", True)
+                break
+            seq += 1
+            tasks.put((seq, index, time.time(), shape))
+    except Exception as e:
+        log.error(f"❌ 캡처 프로세스 에러: {e}")
+    finally:
+        for _ in range(workers):
+            tasks.put(None)
+        results.put(("capture_end", eof, seq, dropped))
+        source.release()
+        ring.close()
+        listener.stop()
+
+
+def worker_main(worker_id, ring_spec, model_config, zones_path, tasks, results, conf=0.65, iou=0.45,
+                log_level="INFO", log_format="text"):
+    """추론 워커 프로세스: 공유 메모리 슬롯을 복사 없이 읽어 추론하고 탐지 배열만 돌려보냄
+
+    추적(track id)은 순서가 보장되어야 하므로 하지 않고, 순서를 맞춘 뒤 조정 프로세스에서 처리
+    """
+    from crosswalkZones import CrosswalkZones
+    from detections import extract_detections
+    from modelRegistry import get_model
+
+    backend, path, threads = model_config
+    # 워커끼리 코어를 나눠 쓰도록 BLAS/OpenMP 스레드도 제한
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    listener = _init_process(f"worker-{worker_id}", log_level, log_format)
+    ring = SharedFrameRing.attach(ring_spec)
+    try:
+        model = load_detector(backend, path, threads)
+        zones = CrosswalkZones.load(zones_path, model.names)
+        # 직사각형 입력(640x320 등)으로 내보낸 모델도 그 크기로 레터박스하도록 명시
+        imgsz = list(get_model(path).imgsz)
+        results.put(("ready", worker_id))
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, index, timestamp, shape = task
+            started_at = time.time()
+            try:
+                frame = ring.array(index, shape, writeable=False)
+                source = zones.prepare(frame) if zones is not None else frame
+                result = model.predict(source, conf=conf, iou=iou, imgsz=imgsz, verbose=False)[0]
+                cls, ids, scores, xyxy = extract_detections(result)
+                if zones is not None:
+                    cls, ids, scores, xyxy = zones.apply(cls, ids, scores, xyxy)
+                speed = dict(result.speed)
+                del frame, source, result
+            except Exception as e:
+                results.put(("error", seq, index, timestamp, shape, f"{e}"))
+                continue
+            speed["queue"] = (started_at - timestamp) * 1000
+            results.put(("result", seq, index, timestamp, shape, (cls, scores, xyxy), speed))
+    except Exception as e:
+        log.error(f"❌ 워커 {worker_id} 에러: {e}")
+    finally:
+        results.put(("done", worker_id))
+        ring.close()
+        listener.stop()
+
+
+class ProcessPipeline:
+    """캡처 프로세스 + 추론 워커 풀 + 조정 프로세스(호출한 쪽) 구성의 멀티 프로세스 파이프라인
+
+    워커는 끝나는 순서가 제각각이므로 결과를 순번(seq)대로 다시 맞춰 next()로 하나씩 돌려줌
+    (추적/체류 시간 상태 갱신은 항상 캡처 순서대로 이루어짐)
+    """
+
+    def __init__(self, source_spec, model_config, workers=0, slots=0, max_frame_shape=(720, 1280, 3),
+                 width=1280, height=640, realtime=False, zones_path=None, conf=0.65, iou=0.45,
+                 log_level="INFO", log_format="text", start_method=None):
+        self.source_spec = source_spec
+        self.model_config = model_config  # (backend, 모델 경로, 워커당 추론 스레드 수)
+        self.workers = workers or default_workers()
+        # 워커마다 처리 중 1개 + 대기 1개, 재정렬 대기/공개 중(스트리밍/스냅샷) 프레임 몫 3개
+        self.slots = slots or self.workers * 2 + 3
+        self.frame_bytes = int(np.prod(max_frame_shape))
+        self.width = width
+        self.height = height
+        self.realtime = realtime
+        self.zones_path = zones_path
+        self.conf = conf
+        self.iou = iou
+        self.log_level = log_level
+        self.log_format = log_format
+        self.eof = False
+        self.failed = False
+        self.captured = 0
+        self.dropped = 0
+        self.ring = None
+        self._ctx = multiprocessing.get_context(start_method)
+        self._tasks = None
+        self._results = None
+        self._stop = None
+        self._capture = None
+        self._workers = []
+        self._done = set()
+        self._capture_ended = False
+        self._worker_lost = False
+        self._pending = {}  # seq -> 워커 결과 (앞 순번이 도착할 때까지 보관)
+        self._next_seq = 1
+
+    def start(self):
+        ctx = self._ctx
+        self.ring = SharedFrameRing(self.slots, self.frame_bytes, ctx.Queue())
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._stop = ctx.Event()
+        for worker_id in range(self.workers):
+            process = ctx.Process(
+                target=worker_main, name=f"worker-{worker_id}", daemon=True,
+                args=(worker_id, self.ring.spec, self.model_config, self.zones_path, self._tasks, self._results,
+                      self.conf, self.iou, self.log_level, self.log_format),
+            )
+            process.start()
+            self._workers.append(process)
+        self._capture = ctx.Process(
+            target=capture_main, name="capture", daemon=True,
+            args=(self.source_spec, self.width, self.height, self.realtime, self.ring.spec, self._tasks,
+                  self._results, self.workers, self._stop, self.log_level, self.log_format),
+        )
+        self._capture.start()
+        log.info(f"🧩 멀티 프로세스 파이프라인 시작: 워커 {self.workers}개, 공유 메모리 슬롯 {self.slots}개 "
+                 f"({self.frame_bytes / 1e6:.1f}MB x {self.slots})")
+        return self
+
+    @property
+    def finished(self):
+        return len(self._done) == self.workers and not self._pending
+
+    def next(self, timeout=1.0):
+        """다음 순번의 (FrameRef, cls, conf, xyxy, speed) 반환 (사용 후 FrameRef.release() 필요)
+
+        타임아웃이거나 모든 워커가 끝났으면 None (끝난 경우 eof/failed로 구분)
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            item = self._pending.pop(self._next_seq, None)
+            if item is not None:
+                self._next_seq += 1
+                if item[0] == "error":
+                    _, seq, index, _, _, message = item
+                    self.ring._release(index)
+                    log.error(f"❌ 워커 추론 에러 (프레임 {seq}): {message}")
+                    continue
+                _, seq, index, timestamp, shape, (cls, conf, xyxy), speed = item
+                frame_ref = FrameRef(self.ring, index, seq, timestamp,
+                                     self.ring.array(index, shape, writeable=False))
+                return frame_ref, cls, conf, xyxy, speed
+            if self.finished:
+                return None
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                message = self._results.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                self._check_processes()
+                continue
+            self._handle(message)
+
+    def _handle(self, message):
+        kind = message[0]
+        if kind in ("result", "error"):
+            if message[1] < self._next_seq:
+                # 이미 건너뛴 순번 (죽은 워커 대신 넘어간 뒤 늦게 도착): 슬롯만 반납
+                self.ring._release(message[2])
+                return
+            self._pending[message[1]] = message
+        elif kind == "done":
+            self._done.add(message[1])
+        elif kind == "capture_end":
+            _, eof, captured, dropped = message
+            self._capture_ended = True
+            self.eof = eof
+            # 종료 요청으로 멈춘 라이브 카메라는 실패가 아님
+            self.failed = self.failed or (not eof and not self._stop.is_set())
+            self.captured = captured
+            self.dropped = dropped
+        elif kind == "ready":
+            log.info(f"🧠 워커 {message[1]} 모델 로드 완료")
+
+    def _check_processes(self):
+        """신호 없이 죽은 프로세스 처리: 캡처가 죽으면 워커에 종료 신호를 대신 보내고,
+        워커가 죽으면 그 워커의 결과를 기다리지 않도록 종료 처리"""
+        if not self._capture_ended and self._capture.exitcode not in (None, 0):
+            # 정상 종료라면 capture_end와 워커 종료 신호를 보내고 끝나므로(exitcode 0), 여기서는 강제 종료된 경우
+            log.error(f"❌ 캡처 프로세스 비정상 종료 (exitcode={self._capture.exitcode})")
+            self._capture_ended = True
+            self.failed = True
+            for _ in range(self.workers):
+                self._tasks.put(None)
+        for worker_id, process in enumerate(self._workers):
+            if worker_id not in self._done and process.exitcode is not None:
+                log.error(f"❌ 워커 {worker_id} 비정상 종료 (exitcode={process.exitcode})")
+                self._done.add(worker_id)
+                self._worker_lost = True
+                self.failed = True
+        if self._worker_lost and self._pending:
+            # 죽은 워커가 들고 있던 순번은 오지 않으므로 건너뛰고 남은 결과를 순서대로 내보냄
+            self._next_seq = min(self._pending)
+
+    def stop(self, timeout=5.0):
+        if self._stop is None:
+            return
+        self._stop.set()
+        # 워커가 결과 큐에 쓰다 막히지 않도록 종료 신호를 받을 때까지 결과를 비움
+        deadline = time.monotonic() + timeout
+        while len(self._done) < self.workers and time.monotonic() < deadline:
+            try:
+                self._handle(self._results.get(timeout=0.2))
+            except queue.Empty:
+                self._check_processes()
+        for item in self._pending.values():
+            self.ring._release(item[2])
+        self._pending.clear()
+        for process in [self._capture] + self._workers:
+            process.join(timeout=max(deadline - time.monotonic(), 0.1))
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=1.0)
+        self.ring.close()
+        self._stop = None
+        log.info(f"🧩 멀티 프로세스 파이프라인 종료: 캡처 {self.captured}개, 버림 {self.dropped}개")
@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+import time
+
+import cv2
+
+from detections import render_frame
+
+log = logging.getLogger(__name__)
+
+
+class SnapshotService:
+    """디버그 프레임을 백그라운드 스레드에서 일정 간격(또는 요청 시)으로만 저장"""
+
+    def __init__(self, source, path="debug_frame.jpg", interval_s=5.0, quality=80, jpeg_max_age_s=1.0):
+        # source(frameRing.FrameSlot): 저장 시점에만 최신 프레임 참조를 잠깐 빌려 씀
+        self.source = source
+        self.path = path
+        self.interval_s = interval_s
+        self.quality = quality
+        self.jpeg_max_age_s = jpeg_max_age_s
+        self.saved = 0
+        self._jpeg = None
+        self._jpeg_time = 0.0
+        self._requested = False
+        self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="snapshot", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def offer_jpeg(self, jpeg):
+        """스트리밍용으로 이미 인코딩된 JPEG가 있으면 재인코딩 없이 그대로 저장에 사용"""
+        with self._cond:
+            self._jpeg = jpeg
+            self._jpeg_time = time.time()
+
+    def request(self):
+        """다음 프레임을 즉시 저장하도록 요청 (예: 긴급 상황 발생 시)"""
+        with self._cond:
+            self._requested = True
+            self._cond.notify_all()
+
+    def _run(self):
+        next_save = time.time()
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: not self._running or self._requested or time.time() >= next_save,
+                    timeout=max(0.0, next_save - time.time()),
+                )
+                if not self._running:
+                    break
+                requested = self._requested
+                self._requested = False
+                jpeg, jpeg_time = self._jpeg, self._jpeg_time
+
+            frame, frame_time = None, 0.0
+            got = self.source.wait(0, timeout=0)
+            if got is not None:
+                frame, frame_time = got[1], time.time()
+            if frame is None and jpeg is None:
+                next_save = time.time() + self.interval_s
+                continue
+            jpeg_fresh = jpeg is not None and jpeg_time >= frame_time - self.jpeg_max_age_s
+            # 요청 저장은 가장 최신 원본 프레임을 우선 사용
+            if requested and frame is not None:
+                jpeg_fresh = False
+
+            try:
+                if not jpeg_fresh:
+                    ok, jpeg = cv2.imencode(".jpg", render_frame(frame), [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+                    if not ok:
+                        raise RuntimeError("JPEG 인코딩 실패")
+                self._write_atomic(jpeg)
+                self.saved += 1
+            except Exception as e:
+                log.error("❌ 디버그 프레임 저장 에러: %s", e)
+            finally:
+                if frame is not None:
+                    frame.release()
+            next_save = time.time() + self.interval_s
+
+    def _write_atomic(self, jpeg):
+        """임시 파일에 쓴 뒤 rename 하여 읽는 쪽이 깨진 파일을 보지 않도록 함"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(memoryview(jpeg))
+        os.replace(tmp_path, self.path)
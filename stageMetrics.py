@@ -0,0 +1,195 @@
+import logging
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """HDR 방식 지연 시간 히스토그램 (2배 구간마다 sub_buckets개의 로그 구간, 상대 오차 약 1/sub_buckets)"""
+
+    def __init__(self, min_ms=0.01, max_ms=60000.0, sub_buckets=16):
+        self.min_ms = min_ms
+        self.sub_buckets = sub_buckets
+        self.size = int(math.ceil(math.log2(max_ms / min_ms) * sub_buckets)) + 2
+        self.counts = [0] * self.size
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        if ms <= self.min_ms:
+            index = 0
+        else:
+            index = min(int(math.log2(ms / self.min_ms) * self.sub_buckets) + 1, self.size - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def upper_bounds(self):
+        """각 구간의 상한 (ms)"""
+        return self.min_ms * np.exp2(np.arange(self.size) / self.sub_buckets)
+
+
+class StageMetrics:
+    """단계별 지연 시간 기록기
+
+    스레드마다 자기 히스토그램에만 기록하므로 기록 경로에 잠금이 없고,
+    읽을 때(snapshot) 모든 스레드의 히스토그램을 합침
+    방마다 생기는 전송 스레드처럼 짧게 사는 스레드는 끝날 때 retire()로 공용 히스토그램에 합쳐 둠
+    """
+
+    def __init__(self, quantiles=(0.5, 0.9, 0.99), **histogram_args):
+        self.quantiles = tuple(quantiles)
+        self.histogram_args = histogram_args
+        self.started_at = time.time()
+        self._local = threading.local()
+        self._all = []  # 스레드별 {단계: LatencyHistogram} (새 스레드가 처음 기록할 때만 잠금)
+        self._retired = {}  # 끝난 스레드들의 합산 {단계: LatencyHistogram}
+        self._lock = threading.Lock()
+
+    def _histograms(self):
+        histograms = getattr(self._local, "histograms", None)
+        if histograms is None:
+            histograms = self._local.histograms = {}
+            with self._lock:
+                self._all.append(histograms)
+        return histograms
+
+    def retire(self):
+        """현재 스레드의 히스토그램을 공용 히스토그램에 합치고 목록에서 뺌 (스레드 종료 직전에 호출)"""
+        histograms = getattr(self._local, "histograms", None)
+        if histograms is None:
+            return
+        self._local.histograms = None
+        with self._lock:
+            self._all = [other for other in self._all if other is not histograms]
+            for stage, histogram in histograms.items():
+                retired = self._retired.get(stage)
+                if retired is None:
+                    self._retired[stage] = histogram
+                    continue
+                retired.counts = [a + b for a, b in zip(retired.counts, histogram.counts)]
+                retired.count += histogram.count
+                retired.total_ms += histogram.total_ms
+                retired.max_ms = max(retired.max_ms, histogram.max_ms)
+
+    def record(self, stage, ms):
+        histograms = self._histograms()
+        histogram = histograms.get(stage)
+        if histogram is None:
+            histogram = histograms[stage] = LatencyHistogram(**self.histogram_args)
+        histogram.record(ms)
+
+    def lap(self, stage, start):
+        """start(time.perf_counter 값)부터 지금까지를 stage로 기록하고 현재 시각 반환 (다음 단계 시작점)"""
+        now = time.perf_counter()
+        self.record(stage, (now - start) * 1000)
+        return now
+
+    def snapshot(self):
+        """단계별 합산 결과: {단계: {count, sum_ms, mean_ms, max_ms, p50_ms, ...}}"""
+        with self._lock:
+            per_thread = list(self._all)
+            per_thread.append(dict(self._retired))
+        merged = {}
+        for histograms in per_thread:
+            for stage, histogram in list(histograms.items()):
+                entry = merged.get(stage)
+                if entry is None:
+                    entry = merged[stage] = {
+                        "counts": np.zeros(histogram.size, dtype=np.int64),
+                        "bounds": histogram.upper_bounds(),
+                        "count": 0, "sum_ms": 0.0, "max_ms": 0.0,
+                    }
+                entry["counts"] += histogram.counts
+                entry["count"] += histogram.count
+                entry["sum_ms"] += histogram.total_ms
+                entry["max_ms"] = max(entry["max_ms"], histogram.max_ms)
+
+        result = {}
+        for stage, entry in sorted(merged.items()):
+            stats = {
+                "count": entry["count"],
+                "sum_ms": round(entry["sum_ms"], 3),
+                "mean_ms": round(entry["sum_ms"] / entry["count"], 3) if entry["count"] else 0.0,
+                "max_ms": round(entry["max_ms"], 3),
+            }
+            cumulative = np.cumsum(entry["counts"])
+            total = cumulative[-1]
+            for q in self.quantiles:
+                if total:
+                    index = int(np.searchsorted(cumulative, q * total, side="left"))
+                    value = min(float(entry["bounds"][index]), entry["max_ms"])
+                else:
+                    value = 0.0
+                stats[f"p{q * 100:g}_ms"] = round(value, 3)
+            result[stage] = stats
+        return result
+
+    def prometheus_text(self, prefix="smart_signal"):
+        """Prometheus 텍스트 형식 (summary 타입)"""
+        name = f"{prefix}_stage_latency_milliseconds"
+        lines = [
+            f"# HELP {name} Per-stage frame processing latency in milliseconds.",
+            f"# TYPE {name} summary",
+        ]
+        for stage, stats in self.snapshot().items():
+            for q in self.quantiles:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q:g}"}} {stats[f"p{q * 100:g}_ms"]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {stats["sum_ms"]}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+        lines.append(f"# HELP {prefix}_uptime_seconds Seconds since the detector process started.")
+        lines.append(f"# TYPE {prefix}_uptime_seconds gauge")
+        lines.append(f"{prefix}_uptime_seconds {time.time() - self.started_at:.1f}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """GET /metrics 요청에 Prometheus 텍스트를 돌려주는 HTTP 서버 (백그라운드 스레드)"""
+
+    def __init__(self, metrics, host="127.0.0.1", port=9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            log.error("❌ 메트릭 서버 시작 에러: %s", e)
+            return self
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        log.info("📊 메트릭 서버 시작: http://%s:%d/metrics", self.host, self.port)
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
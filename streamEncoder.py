@@ -0,0 +1,149 @@
+import base64
+import logging
+import threading
+import time
+
+import cv2
+
+from detections import render_frame
+
+log = logging.getLogger(__name__)
+
+# 화질 단계: 이름 -> (해상도 비율 %, JPEG 품질)
+DEFAULT_TIERS = {
+    "low": (50, 50),
+    "medium": (70, 70),
+    "high": (100, 80),
+}
+FORMATS = ("binary", "base64")
+
+
+class StreamEncoder:
+    """프레임마다 화질 단계별로 한 번만 인코딩해 구독 중인 모든 방에 같은 데이터를 전달"""
+
+    def __init__(self, source, tiers=None, min_interval_s=0.03, on_encoded=None, controller=None, metrics=None):
+        self.source = source  # 탐지 스레드가 프레임을 공개하는 frameRing.FrameSlot
+        self.tiers = dict(tiers or DEFAULT_TIERS)
+        self.min_interval_s = min_interval_s
+        # controller가 있으면 "auto" 단계의 해상도/품질/간격을 네트워크 상태에 맞춰 조절
+        self.controller = controller
+        if controller is not None:
+            self.tiers["auto"] = None
+        self.on_encoded = on_encoded  # (tier, jpeg) 콜백 (예: 스냅샷 재사용)
+        self.metrics = metrics  # stageMetrics.StageMetrics (그리기/인코딩 시간 기록)
+        self.encoded = 0
+        self._payloads = {}  # (tier, fmt) -> (version, data)
+        self._subscribers = {}  # room_id -> (tier, fmt)
+        self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def subscribe(self, room_id, tier, fmt="binary"):
+        if tier not in self.tiers:
+            raise KeyError(f"알 수 없는 화질 단계: {tier}")
+        if fmt not in FORMATS:
+            raise KeyError(f"알 수 없는 전송 형식: {fmt}")
+        with self._cond:
+            self._subscribers[room_id] = (tier, fmt)
+            if self._thread is None or not self._thread.is_alive():
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name="stream-encoder", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def unsubscribe(self, room_id):
+        with self._cond:
+            self._subscribers.pop(room_id, None)
+            self._cond.notify_all()
+
+    def wait_payload(self, tier, fmt="binary", after_version=0, timeout=1.0):
+        """after_version 이후 인코딩된 데이터 (version, data) 반환, 타임아웃 시 None"""
+        key = (tier, fmt)
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: not self._running or self._payloads.get(key, (0, None))[0] > after_version,
+                timeout,
+            )
+            if not ready or not self._running:
+                return None
+            return self._payloads[key]
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def encode(self, frame, tier):
+        if tier == "auto":
+            scale_percent, quality = self.controller.scale_percent, self.controller.quality
+        else:
+            scale_percent, quality = self.tiers[tier]
+        if scale_percent != 100:
+            width = int(frame.shape[1] * scale_percent / 100)
+            height = int(frame.shape[0] * scale_percent / 100)
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        if not ok:
+            raise RuntimeError("JPEG 인코딩 실패")
+        return buffer
+
+    def _run(self):
+        last_version = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: not self._running or self._subscribers)
+                if not self._running:
+                    break
+            # 새 프레임이 공개될 때까지 대기 (프레임은 복사 없이 참조만 받음)
+            got = self.source.wait(last_version, timeout=0.5)
+            if got is None:
+                continue
+            version, item = got
+            with self._cond:
+                wanted = {}
+                for tier, fmt in self._subscribers.values():
+                    wanted.setdefault(tier, set()).add(fmt)
+
+            start = time.time()
+            interval_s = self.min_interval_s
+            if self.controller is not None:
+                self.controller.update()
+                interval_s = max(interval_s, self.controller.interval_s)
+            payloads = {}
+            t = time.perf_counter()
+            try:
+                # 구독자가 있을 때만 탐지 결과를 그림 (프레임당 한 번)
+                frame = render_frame(item)
+                if self.metrics is not None:
+                    t = self.metrics.lap("render", t)
+            except Exception as e:
+                log.error("❌ 프레임 그리기 에러: %s", e)
+                wanted = {}
+            finally:
+                item.release()
+            for tier, formats in wanted.items():
+                try:
+                    buffer = self.encode(frame, tier)
+                    if self.metrics is not None:
+                        t = self.metrics.lap("encode", t)
+                    if self.on_encoded is not None:
+                        self.on_encoded(tier, buffer)
+                    # 바이너리 첨부는 bytes 객체여야 하므로 프레임/화질당 한 번만 만들어 모든 방이 공유
+                    if "binary" in formats:
+                        payloads[(tier, "binary")] = (version, buffer.tobytes())
+                    # 구형 뷰어 호환: 인코더 버퍼에서 바로 base64 변환 (중간 bytes 복사 없음)
+                    if "base64" in formats:
+                        payloads[(tier, "base64")] = (version, base64.b64encode(memoryview(buffer)).decode("ascii"))
+                except Exception as e:
+                    log.error("❌ 프레임 인코딩 에러 (%s): %s", tier, e)
+            self.encoded += 1
+
+            with self._cond:
+                self._payloads.update(payloads)
+                self._cond.notify_all()
+            last_version = version
+
+            # 전송 간격 제한 (기본값은 기존 send_frames의 0.03초 대기와 동일)
+            remaining = interval_s - (time.time() - start)
+            if remaining > 0:
+                time.sleep(remaining)
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class TrackStore:
+    """(class_id, track_id) 정수 키와 사전 할당된 NumPy 배열로 객체 체류 상태를 관리"""
+
+    def __init__(self, capacity=256, max_missing=30):
+        self.capacity = capacity
+        self.max_missing = max_missing  # 탐지 확정 전 객체가 이 프레임 수만큼 안 보이면 정리
+        self.frame = 0
+        self._index = {}  # (class_id, track_id) -> 슬롯 번호
+        self._free = list(range(capacity - 1, -1, -1))
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.class_id = np.full(capacity, -1, dtype=np.int32)
+        self.track_id = np.full(capacity, -1, dtype=np.int64)
+        self.count = np.zeros(capacity, dtype=np.int32)
+        self.start_time = np.zeros(capacity, dtype=np.float64)
+        self.is_detected = np.zeros(capacity, dtype=bool)
+        self.has_sent = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.last_seen = np.zeros(capacity, dtype=np.int64)
+
+    def _grow(self):
+        """슬롯이 부족하면 배열 크기를 두 배로 늘림 (기존 상태 유지)"""
+        old = self.capacity
+        arrays = {name: getattr(self, name) for name in
+                  ("class_id", "track_id", "count", "start_time", "is_detected", "has_sent", "active", "last_seen")}
+        self.capacity = old * 2
+        self._allocate(self.capacity)
+        for name, values in arrays.items():
+            getattr(self, name)[:old] = values
+        self._free.extend(range(self.capacity - 1, old - 1, -1))
+
+    def __len__(self):
+        return len(self._index)
+
+    def observe(self, class_ids, track_ids):
+        """이번 프레임에 보인 객체의 슬롯을 찾거나 만들고 count를 1 증가, 슬롯 배열 반환"""
+        self.frame += 1
+        slots = np.empty(len(class_ids), dtype=np.int64)
+        for i, key in enumerate(zip(class_ids.tolist(), track_ids.tolist())):
+            slot = self._index.get(key)
+            if slot is None:
+                if not self._free:
+                    self._grow()
+                slot = self._free.pop()
+                self._index[key] = slot
+                self.class_id[slot], self.track_id[slot] = key
+                self.count[slot] = 0
+                self.start_time[slot] = 0.0
+                self.is_detected[slot] = False
+                self.has_sent[slot] = False
+                self.active[slot] = True
+            slots[i] = slot
+        self.count[slots] += 1
+        self.last_seen[slots] = self.frame
+        return slots
+
+    def start_dwell(self, slots, now, min_detections):
+        """min_detections 이상 연속 탐지된 객체의 체류 시간 측정 시작, 새로 시작된 슬롯 반환"""
+        started = slots[(self.count[slots] >= min_detections) & ~self.is_detected[slots]]
+        self.start_time[started] = now
+        self.is_detected[started] = True
+        return started
+
+    def dwelling(self, slots, exclude_class_ids=()):
+        """체류 시간 측정 중이며 아직 알림을 보내지 않은 슬롯"""
+        mask = self.is_detected[slots] & ~self.has_sent[slots]
+        if len(exclude_class_ids):
+            mask &= ~np.isin(self.class_id[slots], exclude_class_ids)
+        return slots[mask]
+
+    def elapsed(self, slots, now):
+        return now - self.start_time[slots]
+
+    def mark_sent(self, slots):
+        self.has_sent[slots] = True
+
+    def expire(self):
+        """이번 프레임에 보이지 않은 탐지 확정 객체(및 오래 안 보인 미확정 객체) 제거, 탐지 확정이던 키 반환"""
+        missing = self.active & (self.last_seen != self.frame)
+        stale = missing & ~self.is_detected & (self.frame - self.last_seen > self.max_missing)
+        removed = np.flatnonzero((missing & self.is_detected) | stale)
+        keys = list(zip(self.class_id[removed].tolist(), self.track_id[removed].tolist()))
+        was_detected = self.is_detected[removed].tolist()
+        for key in keys:
+            del self._index[key]
+        self.active[removed] = False
+        self.is_detected[removed] = False
+        self.class_id[removed] = -1
+        self.track_id[removed] = -1
+        self._free.extend(removed.tolist())
+        return [key for key, detected in zip(keys, was_detected) if detected]
@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from lazyImport import lazy_module
+
+requests = lazy_module("requests")
+log = logging.getLogger(__name__)
+
+
+class TrafficReporter:
+    """인구 수 보고를 전용 스레드에서 전송 (실패분은 로컬 스풀 파일에 쌓았다가 연결 복구 시 일괄 재전송)"""
+
+    def __init__(self, url, spool_path="traffic_spool.jsonl", timeout=(3.0, 5.0),
+                 retry_interval_s=30.0, batch_size=50, pool_size=2):
+        self.url = url
+        self.spool_path = spool_path
+        self.timeout = timeout  # (연결, 응답) 제한 시간 초
+        self.retry_interval_s = retry_interval_s
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+        self.sent = 0
+        self.spooled = 0
+        self._queue = queue.Queue()
+        self._session = None
+        self._next_retry = 0.0
+        self._thread = None
+        self._abort = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            # 스레드마다 자기 중단 신호를 가짐 (stop()이 포기한 이전 스레드가 새 스레드 신호에 영향받지 않도록)
+            self._abort = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._abort,), name="traffic-reporter",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """대기 중인 보고를 마저 처리하고 종료 (시간 안에 못 보낸 것은 스풀에 남김)
+
+        스풀 파일은 전송 스레드만 건드리므로, 시간이 지나면 전송을 멈추게 하고 남은 보고의 스풀 기록도
+        스레드에 맡김 (재전송 중 스풀 교체와 겹쳐 보고가 사라지지 않도록)
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            self._abort.set()
+            # 진행 중인 요청 하나가 끝날 때까지만 기다림
+            request_timeout = sum(self.timeout) if isinstance(self.timeout, (tuple, list)) else self.timeout
+            self._thread.join(timeout=request_timeout)
+            if self._thread.is_alive():
+                log.warning("⚠️ 인구 수 보고 스레드가 종료되지 않음, 남은 보고는 스레드가 스풀에 기록")
+        self._thread = None
+
+    def report(self, data):
+        """보고 데이터를 큐에 넣고 즉시 반환 (탐지 스레드는 네트워크를 기다리지 않음)"""
+        self.start()
+        self._queue.put(data)
+
+    def _run(self, abort):
+        pending = []  # 종료 요청 후 전송하지 않고 스풀에 남길 보고
+        while True:
+            try:
+                item = self._queue.get(timeout=self.retry_interval_s)
+            except queue.Empty:
+                item = False
+            if item is None:
+                break
+            if item is not False:
+                if abort.is_set():
+                    pending.append(item)
+                    continue
+                if self._post(item):
+                    self.sent += 1
+                else:
+                    self._spool([item])
+                    self._next_retry = time.time() + self.retry_interval_s
+            if not abort.is_set() and time.time() >= self._next_retry:
+                self._resend_spool(abort)
+        # 종료 신호 뒤에 들어온 보고까지 다음 실행 때 재전송되도록 스풀에 기록
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                pending.append(item)
+        if pending:
+            self._spool(pending)
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        """연결을 재사용하는 requests.Session (첫 전송 때 생성)"""
+        if self._session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Content-Type": "application/json"})
+            self._session = session
+        return self._session
+
+    def _post(self, data):
+        try:
+            response = self._get_session().post(self.url, json=data, timeout=self.timeout)
+            log.info("📤 인구 수 전송: status=%d, response=%s", response.status_code, response.text)
+            # 서버 오류(5xx)는 재전송 대상, 요청 자체가 잘못된 경우(4xx)는 다시 보내도 소용없음
+            return response.status_code < 500
+        except requests.RequestException as e:
+            log.error("❌ 인구 수 전송 에러: %s", e)
+            return False
+
+    def _spool(self, items):
+        """전송 실패한 보고를 스풀 파일 끝에 추가"""
+        try:
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.spooled += len(items)
+            log.info("💾 인구 수 보고 %d건 스풀에 저장: %s", len(items), self.spool_path)
+        except OSError as e:
+            log.error("❌ 스풀 저장 에러: %s", e)
+
+    def _read_spool(self):
+        try:
+            with open(self.spool_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        items = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                # 전원 차단 등으로 잘린 마지막 줄은 버림
+                log.warning("⚠️ 손상된 스풀 레코드 무시: %s", line[:80])
+        return items
+
+    def _resend_spool(self, abort):
+        """스풀에 쌓인 보고를 batch_size 단위로 재전송, 실패하면 남은 것은 그대로 두고 다음에 재시도"""
+        items = self._read_spool()
+        if not items:
+            self._next_retry = time.time() + self.retry_interval_s
+            return
+        log.info("🔁 스풀된 인구 수 보고 재전송 시작: %d건", len(items))
+        done = 0
+        while done < len(items):
+            batch = items[done:done + self.batch_size]
+            sent = 0
+            for item in batch:
+                if abort.is_set() or not self._post(item):
+                    break
+                sent += 1
+            done += sent
+            self.sent += sent
+            if sent < len(batch):
+                break
+        self._rewrite_spool(items[done:])
+        if done < len(items):
+            log.warning("⚠️ 스풀 재전송 중단: %d/%d건 전송, 나머지는 %.0f초 후 재시도", done, len(items), self.retry_interval_s)
+        else:
+            log.info("✅ 스풀 재전송 완료: %d건", done)
+        self._next_retry = time.time() + self.retry_interval_s
+
+    def _rewrite_spool(self, items):
+        """전송한 레코드를 제외하고 스풀 파일 교체 (rename 으로 원자적으로)"""
+        try:
+            if not items:
+                if os.path.exists(self.spool_path):
+                    os.remove(self.spool_path)
+                return
+            tmp_path = self.spool_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.spool_path)
+        except OSError as e:
+            log.error("❌ 스풀 정리 에러: %s", e)
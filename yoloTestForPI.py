@@ -9,6 +9,8 @@ import json
 import requests
 from datetime import datetime, timedelta
 import pygame
+from frameScheduler import AdaptiveFrameSkip
+from modelRegistry import get_model, DEFAULT_MODEL
 
 # Socket.IO 클라이언트 인스턴스 생성
 sio = socketio.Client()
@@ -39,6 +41,7 @@ target_classes = ['guideDog', 'dog', 'fallen', 'whiteCane', 'carAccident', 'pers
 min_detections = 2
 population_window = timedelta(seconds=120)
 active_person_ids = {}
+target_latency_ms = 200  # 프레임 스킵 조절 목표 지연 시간
 
 # 오디오 캐싱
 pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=4096)
@@ -86,8 +89,8 @@ def object_detection():
     """객체 탐지 및 상태 관리 함수"""
     global running, object_states, current_frame, last_sent_time, population, active_person_ids
     try:
-        model = YOLO("model/capstone2.2_ncnn_model")
-        frame_count = 0
+        model = YOLO(get_model(DEFAULT_MODEL).path, task="detect")
+        frame_skip = AdaptiveFrameSkip(target_latency_ms=target_latency_ms)
         print("🔍 객체 탐지 시작...")
 
         while running:
@@ -96,8 +99,7 @@ def object_detection():
                 print("❌ 프레임 읽기 실패")
                 break
 
-            frame_count += 1
-            if frame_count % 3 != 0:  # 프레임 스킵
+            if not frame_skip.should_process():  # 추론 지연 시간 기반 프레임 스킵
                 continue
 
             results = model.track(source=frame, conf=0.7, iou=0.45, persist=True)
@@ -121,6 +123,7 @@ def object_detection():
                         current_objects.add((class_name, obj_id))
 
             cleanup_states()
+            frame_skip.update(results[0].speed, tracking=bool(current_objects))
             manage_population(current_objects, current_datetime)
 
             for class_name, obj_id in current_objects: